@@ -0,0 +1,133 @@
+import re
+from asyncio import Semaphore, TimeoutError, wait_for
+from collections import Counter
+
+from api.response import _503_SERVER_BUSY
+from database.mysql import exam_priority
+from settings.configs import get_settings
+
+settings = get_settings()
+
+
+class LaneOverloaded(Exception):
+    pass
+
+
+class Lane:
+    """
+    一類路由的准入控制：最多 concurrency 個請求同時處理，
+    最多 queue_size 個請求排隊等待 queue_timeout 秒，超過則直接拒絕。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        concurrency: int,
+        queue_size: int,
+        queue_timeout: float,
+    ):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self.counters = Counter()
+        self._semaphore = None
+
+    async def acquire(self):
+        if self._semaphore is None:
+            self._semaphore = Semaphore(self.concurrency)
+
+        if self._semaphore.locked():
+            if self.waiting >= self.queue_size:
+                self.counters["rejected"] += 1
+                raise LaneOverloaded(self.name)
+
+            self.waiting += 1
+            try:
+                await wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except TimeoutError:
+                self.counters["timed_out"] += 1
+                raise LaneOverloaded(self.name)
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.active += 1
+        self.counters["admitted"] += 1
+
+    def release(self):
+        self.active -= 1
+        self._semaphore.release()
+
+
+def new_lanes():
+    lanes = {
+        name: Lane(name, **limits) for name, limits in settings.ADMISSION_LANES.items()
+    }
+
+    # Teacher and bulk requests may hold at most the unreserved DB connections
+    # (enforced per session by database.mysql.connection_slot)
+    unreserved = (
+        settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW - settings.DB_EXAM_RESERVED
+    )
+    if lanes["interactive"].concurrency + lanes["bulk"].concurrency > unreserved:
+        raise ValueError(
+            "admission lanes interactive + bulk exceed the DB connections "
+            f"not reserved for exams ({unreserved})"
+        )
+
+    return lanes
+
+
+lanes = new_lanes()
+
+# (method, path pattern, lane)，依序比對，未符合的路由不限制並發數
+# (但其資料庫連線與 interactive、bulk 共用未保留給測驗的部分)
+LANE_RULES = [
+    ("POST", re.compile(r"^/(user|question)/\w+/(bulk|gradebook)$"), "bulk"),
+    (None, re.compile(r"^/(exam|student|api/question)/|^/login$"), "exam"),
+    (
+        None,
+        re.compile(r"^/(user|question|teacher|import|admin)/|^/api/user$"),
+        "interactive",
+    ),
+]
+
+
+def lane_for(method: str, path: str):
+    for rule_method, pattern, lane in LANE_RULES:
+        if (rule_method is None or rule_method == method) and pattern.match(path):
+            return lanes[lane]
+    return None
+
+
+class AdmissionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        lane = lane_for(scope["method"], scope["path"])
+        if lane is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await lane.acquire()
+        except LaneOverloaded:
+            await _503_SERVER_BUSY(scope, receive, send)
+            return
+
+        # Exam requests may use the DB connections reserved for them
+        token = exam_priority.set(lane.name == "exam")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            exam_priority.reset(token)
+            lane.release()
@@ -1,15 +1,30 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.sessions import SessionMiddleware
 from uvicorn import Config, Server
 
-from settings.configs import Settings
+from settings.configs import get_settings
+from utils.exam_pool import exam_paper_pool
+from utils.import_jobs import import_job_runner
+from utils.metrics import loop_lag_monitor
+from utils.startup_profile import startup_profile
+from utils.submission_queue import submission_queue
+from .admission import AdmissionMiddleware
+from .metrics import MetricsMiddleware
+from .profiler import ProfilerMiddleware, sampling_profiler
+from .static import CompressionMiddleware, FingerprintedStaticFiles
+from .templates import precompile_templates
 from .routers import (
     auth_page_router,
     exam_page_router,
+    import_job_page_router,
     index_page_router,
+    item_analysis_router,
+    metrics_router,
+    profiler_page_router,
     question_api_router,
     question_create_router,
     question_delete_router,
@@ -20,11 +35,38 @@ from .routers import (
     user_read_router,
 )
 
-app = FastAPI()
-settings = Settings()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Compile all templates before serving requests
+    precompile_templates()
+
+    # Start background workers
+    loop_lag_monitor.start()
+    exam_paper_pool.start()
+    if settings.SUBMISSION_QUEUE_ENABLED:
+        submission_queue.start()
+    await import_job_runner.start()
+    startup_profile.mark("lifespan")
+    yield
+
+    # Stop background workers
+    await import_job_runner.stop()
+    await submission_queue.stop()
+    await exam_paper_pool.stop()
+    await loop_lag_monitor.stop()
+    await run_in_threadpool(sampling_profiler.stop)
+
+
+app = FastAPI(lifespan=lifespan)
+settings = get_settings()
 
 # Static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount(
+    "/static",
+    FingerprintedStaticFiles(directory=settings.STATIC_DIR),
+    name="static",
+)
 
 # Routers
 app.include_router(index_page_router, tags=["Index Page"])
@@ -38,10 +80,15 @@ app.include_router(user_delete_router, prefix="/user/delete", tags=["User Delete
 app.include_router(question_create_router, prefix="/question/create", tags=["Question Create"])
 app.include_router(question_read_router, prefix="/question/read", tags=["Question Read"])
 app.include_router(question_delete_router, prefix="/question/delete", tags=["Question Delete"])
+app.include_router(item_analysis_router, prefix="/question/analysis", tags=["Item Analysis"])
+app.include_router(import_job_page_router, prefix="/import/job", tags=["Import Job"])
 
 app.include_router(user_api_router, prefix="/api/user", tags=["User"])
 app.include_router(question_api_router, prefix="/api/question", tags=["Question"])
 
+app.include_router(metrics_router, tags=["Metrics"])
+app.include_router(profiler_page_router, prefix="/admin/profile", tags=["Profiler"])
+
 # CORS settings
 origins = ["http://127.0.0.1"]  # domain name
 app.add_middleware(
@@ -60,6 +107,18 @@ app.add_middleware(
     https_only=True,
 )
 
+# Admission control (exam / interactive / bulk lanes)
+app.add_middleware(AdmissionMiddleware)
+
+# Compress dynamic HTML / CSV responses
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
+# On-demand sampling profiler (admin only, idle unless a session is running)
+app.add_middleware(ProfilerMiddleware)
+
+# Request latency / status metrics (outermost, includes admission queueing)
+app.add_middleware(MetricsMiddleware)
+
 
 # Middleware
 # @app.middleware("http")
@@ -75,8 +134,18 @@ app.add_middleware(
 #         )
 
 
+class ProfiledServer(Server):
+    async def startup(self, sockets=None):
+        await super().startup(sockets=sockets)
+
+        # Socket bound after the lifespan startup, ready to serve requests
+        if self.started:
+            startup_profile.mark("ready")
+            startup_profile.report()
+
+
 # Run FastAPI with Uvicorn
 async def api_run():
     config = Config(app=app, host=settings.APP_HOST, port=settings.APP_PORT)
-    server = Server(config=config)
+    server = ProfiledServer(config=config)
     await server.serve()
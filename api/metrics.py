@@ -0,0 +1,178 @@
+from time import perf_counter
+
+from api.admission import lanes
+from database.mysql import engine
+from settings.configs import get_settings
+from utils.cache import caches
+from utils.metrics import Counter, Gauge, Histogram, registry
+from utils.throttle import login_throttle
+
+settings = get_settings()
+
+request_latency = registry.register(
+    Histogram(
+        "qb_http_request_duration_seconds",
+        "HTTP request latency by route",
+        settings.METRICS_LATENCY_BUCKETS,
+        ["method", "route"],
+    )
+)
+requests_total = registry.register(
+    Counter(
+        "qb_http_requests_total",
+        "HTTP requests by route and status code",
+        ["method", "route", "status"],
+    )
+)
+request_errors = registry.register(
+    Counter(
+        "qb_http_request_errors_total",
+        "HTTP requests that raised an unhandled exception",
+        ["method", "route"],
+    )
+)
+
+
+def _pool_connections():
+    # NullPool / StaticPool have no connection counters
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return []
+    return [
+        (("checked_out",), pool.checkedout()),
+        (("checked_in",), pool.checkedin()),
+        (("overflow",), pool.overflow()),
+    ]
+
+
+def _pool_size():
+    pool = engine.pool
+    if not hasattr(pool, "size"):
+        return []
+    return [((), pool.size())]
+
+
+def _cache_hit_ratio():
+    for cache in caches:
+        lookups = cache.hits + cache.misses
+        yield (cache.name,), cache.hits / lookups if lookups else 0.0
+
+
+registry.register(
+    Gauge(
+        "qb_db_pool_connections",
+        "Database pool connections by state",
+        ["state"],
+        collect=_pool_connections,
+    )
+)
+registry.register(
+    Gauge("qb_db_pool_size", "Database pool size", collect=_pool_size)
+)
+registry.register(
+    Gauge(
+        "qb_cache_entries",
+        "Entries held by each cache",
+        ["cache"],
+        collect=lambda: [((cache.name,), len(cache)) for cache in caches],
+    )
+)
+registry.register(
+    Counter(
+        "qb_cache_lookups_total",
+        "Cache lookups by result",
+        ["cache", "result"],
+        collect=lambda: [
+            ((cache.name, result), count)
+            for cache in caches
+            for result, count in [("hit", cache.hits), ("miss", cache.misses)]
+        ],
+    )
+)
+registry.register(
+    Gauge(
+        "qb_cache_hit_ratio",
+        "Cache hit ratio since startup",
+        ["cache"],
+        collect=_cache_hit_ratio,
+    )
+)
+registry.register(
+    Gauge(
+        "qb_admission_lane_requests",
+        "Requests being handled or waiting in each admission lane",
+        ["lane", "state"],
+        collect=lambda: [
+            ((lane.name, state), count)
+            for lane in lanes.values()
+            for state, count in [("active", lane.active), ("waiting", lane.waiting)]
+        ],
+    )
+)
+registry.register(
+    Counter(
+        "qb_admission_lane_decisions_total",
+        "Admission decisions by lane",
+        ["lane", "decision"],
+        collect=lambda: [
+            ((lane.name, decision), count)
+            for lane in lanes.values()
+            for decision, count in lane.counters.items()
+        ],
+    )
+)
+registry.register(
+    Counter(
+        "qb_login_throttle_decisions_total",
+        "Login throttle decisions",
+        ["decision"],
+        collect=lambda: [
+            ((decision,), count)
+            for decision, count in login_throttle.counters.items()
+        ],
+    )
+)
+
+
+class MetricsMiddleware:
+    """
+    記錄每個請求的處理時間、狀態碼與未處理的例外，以路由樣板 (如 /exam/{exam_type})
+    作為標籤，避免路徑參數使標籤數量無限增加。
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.routes = None
+
+    def route_name(self, scope):
+        if self.routes is None:
+            # Router records the matched endpoint (or mounted app) in the scope
+            self.routes = {
+                getattr(route, "endpoint", None) or route.app: route.path
+                for route in scope["app"].routes
+            }
+        return self.routes.get(scope.get("endpoint"), "other")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started_at = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            request_errors.inc(scope["method"], self.route_name(scope))
+            raise
+        finally:
+            route = self.route_name(scope)
+            request_latency.observe(perf_counter() - started_at, scope["method"], route)
+            requests_total.inc(scope["method"], route, status_code)
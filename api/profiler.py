@@ -0,0 +1,188 @@
+import sys
+import tracemalloc
+from asyncio import current_task
+from collections import Counter
+from os.path import relpath
+from pathlib import Path
+from random import random
+from sysconfig import get_paths
+from threading import Event, Thread, get_ident
+from time import monotonic
+from uuid import uuid4
+
+from settings.configs import get_settings
+
+settings = get_settings()
+
+PROJECT_DIR = str(Path(__file__).resolve().parents[1])
+STDLIB_DIR = get_paths()["stdlib"]
+
+
+def short_path(filename: str):
+    # Project files relative to the repo, libraries relative to their install dir
+    for prefix in [PROJECT_DIR, STDLIB_DIR]:
+        if filename.startswith(prefix):
+            return relpath(filename, prefix)
+    if "site-packages" in filename:
+        return filename.split("site-packages", 1)[1].lstrip("/\\")
+    return filename
+
+
+def frame_name(code):
+    return f"{code.co_name} ({short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+def fold_frame(frame):
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def fold_traceback(traceback):
+    # tracemalloc tracebacks are most recent frame first
+    return ";".join(
+        f"{short_path(frame.filename)}:{frame.lineno}" for frame in reversed(traceback)
+    )
+
+
+class ProfileSession:
+    """
+    一次取樣分析：在 duration 秒內，對路徑以 route 開頭的請求，依 percentage 的比例取樣。
+    memory 為 True 時同時以 tracemalloc 記錄期間配置且尚未釋放的記憶體。
+    """
+
+    def __init__(self, percentage: float, route: str, duration: float, memory: bool):
+        self.id = str(uuid4())
+        self.percentage = percentage
+        self.route = route
+        self.duration = duration
+        self.memory = memory
+        self.started_at = monotonic()
+        self.deadline = self.started_at + duration
+        self.requests = 0
+        self.samples = 0
+        self.stacks = Counter()
+        self.memory_stacks = Counter()
+        self.finished = False
+
+    def wants(self, path: str):
+        return path.startswith(self.route) and random() * 100 < self.percentage
+
+    def folded(self, stacks: Counter):
+        # Brendan Gregg's collapsed stack format (flamegraph.pl, speedscope)
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class SamplingProfiler:
+    """
+    由背景執行緒每 interval 秒讀取 event loop 執行緒的呼叫堆疊，
+    只在 event loop 正在執行被取樣請求的 task 時記錄，因此結果為各請求實際占用 CPU 的位置
+    (Jinja 渲染、itsdangerous、ORM 物件建立、bcrypt 等)，等待資料庫的時間不計入。
+    同一時間只有一個取樣分析，未啟動時不增加任何負擔。
+    """
+
+    def __init__(self, interval: float, memory_frames: int):
+        self.interval = interval
+        self.memory_frames = memory_frames
+        self.session = None
+        self.tasks = set()
+        self._loop = None
+        self._loop_thread = None
+        self._stopped = None
+        self._thread = None
+
+    @property
+    def active(self):
+        return self.session is not None and not self.session.finished
+
+    def start(self, loop, percentage: float, route: str, duration: float, memory: bool):
+        if self.active:
+            self.stop()
+
+        self.session = ProfileSession(percentage, route, duration, memory)
+        self.tasks = set()
+        self._loop = loop
+        self._loop_thread = get_ident()
+        if memory:
+            tracemalloc.start(self.memory_frames)
+
+        self._stopped = Event()
+        self._thread = Thread(target=self._sample, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self.session
+
+    def stop(self):
+        """停止取樣並等待背景執行緒結束 (含記憶體快照)，會阻塞，請勿在 event loop 上呼叫。"""
+        if not self.active:
+            return
+
+        self._stopped.set()
+        self._thread.join()
+
+    def _sample(self):
+        session = self.session
+        try:
+            while not self._stopped.wait(self.interval):
+                if monotonic() >= session.deadline:
+                    break
+
+                task = current_task(self._loop)
+                if task is None or task not in self.tasks:
+                    continue
+
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is not None:
+                    session.stacks[fold_frame(frame)] += 1
+                    session.samples += 1
+        finally:
+            if session.memory:
+                self._snapshot_memory(session)
+            session.finished = True
+            self.tasks = set()
+
+    def _snapshot_memory(self, session):
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ]
+        )
+        tracemalloc.stop()
+        for stat in snapshot.statistics("traceback"):
+            session.memory_stacks[fold_traceback(stat.traceback)] += stat.size
+
+    def enter(self, path: str):
+        """請求開始時呼叫，回傳是否取樣此請求。"""
+        session = self.session
+        if session is None or session.finished or not session.wants(path):
+            return False
+
+        session.requests += 1
+        self.tasks.add(current_task())
+        return True
+
+    def leave(self):
+        self.tasks.discard(current_task())
+
+
+sampling_profiler = SamplingProfiler(
+    interval=settings.PROFILER_INTERVAL,
+    memory_frames=settings.PROFILER_MEMORY_FRAMES,
+)
+
+
+class ProfilerMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not sampling_profiler.enter(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            sampling_profiler.leave()
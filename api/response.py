@@ -1,8 +1,5 @@
 from fastapi import HTTPException, status
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-
-templates = Jinja2Templates(directory="templates")
 
 
 # Render Page Responses
@@ -48,6 +45,21 @@ _403_NOT_A_ADMIN_OR_TEACHER = HTMLResponse(
     status_code=status.HTTP_403_FORBIDDEN,
 )
 
+_403_NOT_A_ADMIN = HTMLResponse(
+    "您的角色非管理員，無法使用該功能",
+    status_code=status.HTTP_403_FORBIDDEN,
+)
+
+_403_EXAM_SESSION_INVALID = HTMLResponse(
+    "測驗已失效，請重新開始測驗",
+    status_code=status.HTTP_403_FORBIDDEN,
+)
+
+_403_METRICS_HOST_NOT_ALLOWED = HTMLResponse(
+    "無法存取系統監控資料",
+    status_code=status.HTTP_403_FORBIDDEN,
+)
+
 _404_EXAM_TYPE_NOT_FOUND = HTMLResponse(
     "該考試科目不存在",
     status_code=status.HTTP_404_NOT_FOUND,
@@ -58,6 +70,29 @@ _404_EXAM_RECORD_NOT_FOUND = HTMLResponse(
     status_code=status.HTTP_404_NOT_FOUND,
 )
 
+_404_IMPORT_JOB_NOT_FOUND = HTMLResponse(
+    "該匯入工作不存在",
+    status_code=status.HTTP_404_NOT_FOUND,
+)
+
+_404_PROFILE_NOT_FOUND = HTMLResponse(
+    "沒有已完成的取樣結果",
+    status_code=status.HTTP_404_NOT_FOUND,
+)
+
+_429_TOO_MANY_LOGIN_ATTEMPTS = HTMLResponse(
+    "登入嘗試次數過多，請稍後再試",
+    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+    headers={"Retry-After": "60"},
+)
+
+# 5xx Responses
+_503_SERVER_BUSY = HTMLResponse(
+    "系統忙碌中，請稍後再試",
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    headers={"Retry-After": "5"},
+)
+
 # Question API Responses
 _403_NOT_LOGIN_API = HTTPException(
     status_code=status.HTTP_403_FORBIDDEN,
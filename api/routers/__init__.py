@@ -1,6 +1,10 @@
 from .auth_page import router as auth_page_router
 from .exam_page import router as exam_page_router
+from .import_job_page import router as import_job_page_router
 from .index_page import router as index_page_router
+from .item_analysis import router as item_analysis_router
+from .metrics import router as metrics_router
+from .profiler_page import router as profiler_page_router
 from .question_api import router as question_api_router
 from .question_create import router as question_create_router
 from .question_delete import router as question_delete_router
@@ -4,10 +4,12 @@ from fastapi import APIRouter, Depends, Form, Request
 from api.response import (
     _302_REDIRECT_TO_HOME,
     _401_LOGIN_FAILED,
+    _429_TOO_MANY_LOGIN_ATTEMPTS,
 )
 from auth.passwd import verify_password
 from .depends import get_current_user
 from crud.user import UserCrudManager
+from utils.throttle import login_throttle
 
 router = APIRouter()
 UserCrud = UserCrudManager()
@@ -33,11 +35,19 @@ async def login(
     if current_user:
         return _302_REDIRECT_TO_HOME
 
+    # Check if too many login attempts (before any database query or bcrypt)
+    client_ip = request.client.host if request.client else ""
+    if not await login_throttle.allow(username, client_ip):
+        return _429_TOO_MANY_LOGIN_ATTEMPTS
+
     # Check if user exists and password is correct
     user = await UserCrud.get_by_username(username)
     if not user or not verify_password(password, user.password):
         return _401_LOGIN_FAILED
 
+    # Only failed attempts count towards the limits
+    await login_throttle.succeeded(username, client_ip)
+
     # Create session
     request.session.update(new_session(user.id))
     return _302_REDIRECT_TO_HOME
@@ -1,23 +1,35 @@
 from fastapi import APIRouter, Depends, Request, status
 from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
 
 from .depends import get_current_user
 from api.response import (
     _302_REDIRECT_TO_HOME,
     _403_CANNOT_ACCESS_OTHER_USER_DATA,
+    _403_EXAM_SESSION_INVALID,
     _403_NOT_A_STUDENT,
     _404_EXAM_RECORD_NOT_FOUND,
     _404_EXAM_TYPE_NOT_FOUND,
 )
+from api.templates import templates
 from crud.exam_record import ExamRecordCrudManager
-from models.base import Role
+from models.base import Exam_mode, Role
 from schemas import exam_record as ExamRecordSchema
+from settings.configs import get_settings
 from settings.subject import SUBJECT_EXAM_INFO
-from utils.exam import random_choose_questions
+from utils.exam import (
+    get_exam_history_page,
+    get_exam_questions_data,
+    get_exam_result_answers_data,
+    get_exam_result_data,
+    random_choose_questions,
+    record_exam_answers,
+)
+from utils.exam_session import exam_session_store
+from utils.question import normalize_user_answer
+from utils.submission_queue import submission_queue
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
+settings = get_settings()
 
 ExamRecordCrud = ExamRecordCrudManager()
 
@@ -26,6 +38,7 @@ ExamRecordCrud = ExamRecordCrudManager()
 async def exam_page(
     request: Request,
     exam_type: str,
+    mode: Exam_mode = Exam_mode.RANDOM,
     current_user=Depends(get_current_user),
 ):
     # Check if not logged in
@@ -40,6 +53,10 @@ async def exam_page(
     if exam_type not in SUBJECT_EXAM_INFO:
         return _404_EXAM_TYPE_NOT_FOUND
 
+    # Choose questions and remember them in a new exam session
+    paper = await random_choose_questions(exam_type, current_user.id, mode)
+    exam_session_id = exam_session_store.create(current_user.id, exam_type, paper)
+
     # Render exam.html
     return templates.TemplateResponse(
         "exam.html",
@@ -47,7 +64,8 @@ async def exam_page(
             "request": request,
             "current_user": current_user,
             "subject": SUBJECT_EXAM_INFO[exam_type],
-            "questions": await random_choose_questions(exam_type, current_user.id),
+            "questions": get_exam_questions_data(paper, current_user.id),
+            "exam_session_id": exam_session_id,
         },
     )
 
@@ -70,35 +88,59 @@ async def submit_exam(
     if exam_type not in SUBJECT_EXAM_INFO:
         return _404_EXAM_TYPE_NOT_FOUND
 
-    # Get user_answer list
+    # Check if the exam session was issued to the current user
     form = await request.form()
+    exam_session_id = form.get("exam_session_id")
+    exam_session = exam_session_store.get(exam_session_id)
+    if (
+        not exam_session
+        or exam_session.user_id != current_user.id
+        or exam_session.exam_type != exam_type
+    ):
+        return _403_EXAM_SESSION_INVALID
+
+    # Take the session before the first await, a concurrent resubmission is rejected
+    exam_session_store.remove(exam_session_id)
+
+    # Get user_answer list (Only questions issued in the exam session)
+    # Invalid answers (not A, B, C, D or longer than 4) become "輸入錯誤"
     user_answers = [
         {
-            "question_id": k,
-            "user_answer": "".join(sorted(list(item for item in v))),
+            "question_id": question_id,
+            "user_answer": normalize_user_answer(form.get(question_id, "")),
         }
-        for k, v in dict(form).items()
+        for question_id in exam_session.question_ids
     ]
 
-    # Check if user_answer is valid (Only Uppercase A, B, C, D)
-    for item in user_answers:
-        for c in item["user_answer"]:
-            if c not in ["A", "B", "C", "D"]:
-                item["user_answer"] = "輸入錯誤"
-
-    # Create new exam record into database
-    new_exam_record = ExamRecordSchema.ExamRecordCreate(
-        exam_type=exam_type,
-        user_answers=user_answers,
-    )
-    exam_record = await ExamRecordCrud.create(
-        user_id=current_user.id,
-        newExamRecord=new_exam_record,
-    )
+    answer_keys = dict(zip(exam_session.question_ids, exam_session.answers))
+    try:
+        if settings.SUBMISSION_QUEUE_ENABLED:
+            # Queue the exam record, written to database in batches
+            exam_record = await submission_queue.submit(
+                current_user.id, exam_type, user_answers, answer_keys
+            )
+            exam_record_id = exam_record["id"]
+        else:
+            # Create new exam record into database
+            new_exam_record = ExamRecordSchema.ExamRecordCreate(
+                exam_type=exam_type,
+                user_answers=user_answers,
+            )
+            exam_record = await ExamRecordCrud.create(
+                user_id=current_user.id,
+                newExamRecord=new_exam_record,
+                answer_keys=answer_keys,
+            )
+            exam_record_id = exam_record.id
+    except BaseException:
+        # Not recorded, the student can submit again
+        exam_session_store.restore(exam_session_id, exam_session)
+        raise
+    record_exam_answers(exam_type, current_user.id, user_answers, answer_keys)
 
     # Redirect to exam record page
     return RedirectResponse(
-        f"/exam/record/{exam_record.id}",
+        f"/exam/record/{exam_record_id}",
         status_code=status.HTTP_302_FOUND,
     )
 
@@ -114,34 +156,60 @@ async def get_exam_record(
         return _302_REDIRECT_TO_HOME
 
     # Check exam_record_id is valid
-    exam_record = await ExamRecordCrud.get(exam_record_id)
-    if not exam_record:
+    exam_result = await get_exam_result_data(exam_record_id)
+    if not exam_result:
         return _404_EXAM_RECORD_NOT_FOUND
 
     # Check if the exam_record belongs to the current user (if current_user == student)
-    if current_user.role == Role.STUDENT and exam_record.user_id != current_user.id:
+    if current_user.role == Role.STUDENT and exam_result["user_id"] != current_user.id:
         return _403_CANNOT_ACCESS_OTHER_USER_DATA
 
-    # Prepare data for rendering
-    accuracy = (
-        f"{(exam_record.score / len(exam_record.user_answers)) * 100:.2f}%"
-        if exam_record.user_answers
-        else "0.00%"
-    )
-    rendered_user_answers = await ExamRecordCrud.get_rendered_user_answers_data(
-        user_id=current_user.id,
-        exam_record_id=exam_record_id,
-    )
-
     # Render exam_result.html
     return templates.TemplateResponse(
         "exam_result.html",
         {
             "request": request,
             "current_user": current_user,
-            "subject": SUBJECT_EXAM_INFO[exam_record.exam_type],
-            "score": exam_record.score,
-            "accuracy": accuracy,
-            "user_answers": rendered_user_answers,
+            "subject": SUBJECT_EXAM_INFO[exam_result["exam_type"]],
+            "score": exam_result["score"],
+            "accuracy": exam_result["accuracy"],
+            "user_answers": await get_exam_result_answers_data(
+                exam_result, current_user.id
+            ),
+        },
+    )
+
+
+@router.get("/history/{user_id}/{exam_type}")
+async def get_exam_history(
+    request: Request,
+    user_id: str,
+    exam_type: str,
+    cursor: str = "",
+    current_user=Depends(get_current_user),
+):
+    # Check if not logged in
+    if not current_user:
+        return _302_REDIRECT_TO_HOME
+
+    # Check if the history belongs to the current user (if current_user == student)
+    if current_user.role == Role.STUDENT and user_id != current_user.id:
+        return _403_CANNOT_ACCESS_OTHER_USER_DATA
+
+    # Check exam_type is valid
+    if exam_type not in SUBJECT_EXAM_INFO:
+        return _404_EXAM_TYPE_NOT_FOUND
+
+    # Render exam_history.html (one page after the cursor)
+    exam_records, next_cursor = await get_exam_history_page(user_id, exam_type, cursor)
+    return templates.TemplateResponse(
+        "exam_history.html",
+        {
+            "request": request,
+            "current_user": current_user,
+            "subject": SUBJECT_EXAM_INFO[exam_type],
+            "user_id": user_id,
+            "exam_records": exam_records,
+            "next_cursor": next_cursor,
         },
     )
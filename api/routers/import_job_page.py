@@ -0,0 +1,87 @@
+from fastapi import APIRouter, Depends, Request
+
+from .depends import get_current_user
+from api.response import (
+    _302_REDIRECT_TO_HOME,
+    _403_NOT_A_ADMIN_OR_TEACHER,
+    _404_IMPORT_JOB_NOT_FOUND,
+)
+from api.templates import templates
+from crud.import_job import ImportJobCrudManager
+from models.base import Import_status, Role
+
+router = APIRouter()
+
+ImportJobCrud = ImportJobCrudManager()
+
+
+def import_job_status(job, failures):
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "filename": job.filename,
+        "status": job.status,
+        "finished": job.status in [Import_status.DONE, Import_status.FAILED],
+        "total": job.total,
+        "processed": job.processed,
+        "succeeded": job.succeeded,
+        "failed": job.failed,
+        "error": job.error,
+        "failures": [
+            {"row_number": row_number, "item": item, "reason": reason}
+            for row_number, item, reason in failures
+        ],
+    }
+
+
+@router.get("/{job_id}")
+async def import_job_page(
+    request: Request,
+    job_id: str,
+    current_user=Depends(get_current_user),
+):
+    # Check if not logged in
+    if not current_user:
+        return _302_REDIRECT_TO_HOME
+
+    # Check if user is teacher or admin
+    if current_user.role not in [Role.TEACHER, Role.ADMIN]:
+        return _403_NOT_A_ADMIN_OR_TEACHER
+
+    # Check if import job exists
+    job = await ImportJobCrud.get(job_id)
+    if not job:
+        return _404_IMPORT_JOB_NOT_FOUND
+
+    # Render import_job.html (reloads itself until the job is finished)
+    failures = await ImportJobCrud.get_failures(job_id)
+    return templates.TemplateResponse(
+        "import_job.html",
+        {
+            "request": request,
+            "current_user": current_user,
+            "job": import_job_status(job, failures),
+        },
+    )
+
+
+@router.get("/{job_id}/status")
+async def import_job_status_api(
+    job_id: str,
+    current_user=Depends(get_current_user),
+):
+    # Check if not logged in
+    if not current_user:
+        return _302_REDIRECT_TO_HOME
+
+    # Check if user is teacher or admin
+    if current_user.role not in [Role.TEACHER, Role.ADMIN]:
+        return _403_NOT_A_ADMIN_OR_TEACHER
+
+    # Check if import job exists
+    job = await ImportJobCrud.get(job_id)
+    if not job:
+        return _404_IMPORT_JOB_NOT_FOUND
+
+    failures = await ImportJobCrud.get_failures(job_id)
+    return import_job_status(job, failures)
@@ -1,5 +1,4 @@
 from fastapi import APIRouter, Depends, Request
-from fastapi.templating import Jinja2Templates
 
 from .depends import get_current_user
 from api.response import (
@@ -9,11 +8,11 @@ from api.response import (
     _403_NOT_A_STUDENT,
     _403_NOT_A_ADMIN_OR_TEACHER,
 )
+from api.templates import templates
 from models.base import Role
-from utils.exam import get_exam_render_info
+from utils.exam import get_exam_records_html
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
 
 
 @router.get("/")
@@ -53,7 +52,9 @@ async def student_dashboard(
             "request": request,
             "current_user": current_user,
             "student_info": current_user,
-            "exam_lists": await get_exam_render_info(current_user.id),
+            "exam_records": await get_exam_records_html(
+                current_user.id, templates.get_template("dashboard_exam_records.html")
+            ),
         },
     )
 
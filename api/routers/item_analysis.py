@@ -0,0 +1,108 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, Form, Request
+from fastapi.responses import StreamingResponse
+
+from .depends import get_current_user
+from api.response import (
+    _302_REDIRECT_TO_HOME,
+    _403_NOT_A_ADMIN_OR_TEACHER,
+)
+from api.templates import templates
+from models.base import Role, Subject
+from utils.export import csv_download_headers, stream_csv
+from utils.item_analysis import (
+    ITEM_ANALYSIS_HEADER,
+    get_item_analysis,
+    item_analysis_csv_row,
+)
+
+router = APIRouter()
+
+
+@router.get("")
+async def item_analysis(
+    request: Request,
+    current_user=Depends(get_current_user),
+):
+    # Check if not logged in
+    if not current_user:
+        return _302_REDIRECT_TO_HOME
+
+    # Check if user is teacher or admin
+    if current_user.role not in [Role.TEACHER, Role.ADMIN]:
+        return _403_NOT_A_ADMIN_OR_TEACHER
+
+    # Render item_analysis.html
+    return templates.TemplateResponse(
+        "item_analysis.html",
+        {
+            "request": request,
+            "current_user": current_user,
+        },
+    )
+
+
+@router.post("")
+async def item_analysis_post(
+    request: Request,
+    subject: Subject = Form(...),
+    current_user=Depends(get_current_user),
+):
+    # Check if not logged in
+    if not current_user:
+        return _302_REDIRECT_TO_HOME
+
+    # Check if user is teacher or admin
+    if current_user.role not in [Role.TEACHER, Role.ADMIN]:
+        return _403_NOT_A_ADMIN_OR_TEACHER
+
+    # Check if the subject has any questions
+    items = await get_item_analysis(subject)
+    if not items:
+        return templates.TemplateResponse(
+            "item_analysis.html",
+            {
+                "request": request,
+                "current_user": current_user,
+                "error": "該科目無題目",
+            },
+        )
+
+    # Render item_analysis.html
+    return templates.TemplateResponse(
+        "item_analysis.html",
+        {
+            "request": request,
+            "current_user": current_user,
+            "subject": subject.value,
+            "items": items,
+        },
+    )
+
+
+@router.post("/bulk")
+async def item_analysis_csv_post(
+    subject: Subject = Form(...),
+    current_user=Depends(get_current_user),
+):
+    # Check if not logged in
+    if not current_user:
+        return _302_REDIRECT_TO_HOME
+
+    # Check if user is teacher or admin
+    if current_user.role not in [Role.TEACHER, Role.ADMIN]:
+        return _403_NOT_A_ADMIN_OR_TEACHER
+
+    # Generate CSV content
+    items = await get_item_analysis(subject)
+
+    async def item_rows():
+        yield [item_analysis_csv_row(item) for item in items]
+
+    # Return CSV as downloadable file
+    csv_filename = f"{subject.value}_item_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    return StreamingResponse(
+        stream_csv(ITEM_ANALYSIS_HEADER, item_rows()),
+        media_type="text/csv",
+        headers=csv_download_headers(csv_filename),
+    )
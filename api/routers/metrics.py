@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from api.response import _403_METRICS_HOST_NOT_ALLOWED
+from settings.configs import get_settings
+from utils.metrics import registry
+
+router = APIRouter()
+settings = get_settings()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    # Check if the request comes from a monitoring host
+    client_host = request.client.host if request.client else None
+    if client_host not in settings.METRICS_ALLOWED_HOSTS:
+        return _403_METRICS_HOST_NOT_ALLOWED
+
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4",
+    )
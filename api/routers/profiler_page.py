@@ -0,0 +1,129 @@
+from asyncio import get_running_loop
+from fastapi import APIRouter, Depends, Form, Request
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from .depends import get_current_user
+from api.profiler import sampling_profiler
+from api.response import (
+    _302_REDIRECT_TO_HOME,
+    _403_NOT_A_ADMIN,
+    _404_PROFILE_NOT_FOUND,
+)
+from api.templates import templates
+from models.base import Role
+from settings.configs import get_settings
+
+router = APIRouter()
+settings = get_settings()
+
+
+def render_profiler_page(request: Request, current_user, **context):
+    return templates.TemplateResponse(
+        "profiler.html",
+        {
+            "request": request,
+            "current_user": current_user,
+            "session": sampling_profiler.session,
+            "active": sampling_profiler.active,
+            "max_duration": settings.PROFILER_MAX_DURATION,
+            **context,
+        },
+    )
+
+
+@router.get("")
+async def profiler_page(
+    request: Request,
+    current_user=Depends(get_current_user),
+):
+    # Check if not logged in
+    if not current_user:
+        return _302_REDIRECT_TO_HOME
+
+    # Check if user is admin
+    if current_user.role != Role.ADMIN:
+        return _403_NOT_A_ADMIN
+
+    # Render profiler.html
+    return render_profiler_page(request, current_user)
+
+
+@router.post("")
+async def profiler_start(
+    request: Request,
+    percentage: float = Form(...),
+    route: str = Form("/"),
+    duration: int = Form(...),
+    memory: bool = Form(False),
+    current_user=Depends(get_current_user),
+):
+    # Check if not logged in
+    if not current_user:
+        return _302_REDIRECT_TO_HOME
+
+    # Check if user is admin
+    if current_user.role != Role.ADMIN:
+        return _403_NOT_A_ADMIN
+
+    # Check if parameters are valid
+    if not 0 < percentage <= 100 or not route.startswith("/"):
+        return render_profiler_page(
+            request, current_user, error="取樣比例需介於 0~100，路徑需以 / 開頭"
+        )
+    if not 0 < duration <= settings.PROFILER_MAX_DURATION:
+        return render_profiler_page(
+            request,
+            current_user,
+            error=f"取樣時間需介於 1~{settings.PROFILER_MAX_DURATION} 秒",
+        )
+
+    # Replaces the running session, if any (stopping waits for its memory snapshot)
+    await run_in_threadpool(sampling_profiler.stop)
+    sampling_profiler.start(get_running_loop(), percentage, route, duration, memory)
+    return render_profiler_page(request, current_user, success="已開始取樣")
+
+
+@router.post("/stop")
+async def profiler_stop(
+    request: Request,
+    current_user=Depends(get_current_user),
+):
+    # Check if not logged in
+    if not current_user:
+        return _302_REDIRECT_TO_HOME
+
+    # Check if user is admin
+    if current_user.role != Role.ADMIN:
+        return _403_NOT_A_ADMIN
+
+    # Waits for the sampling thread, which takes the memory snapshot (seconds)
+    await run_in_threadpool(sampling_profiler.stop)
+    return render_profiler_page(request, current_user, success="已停止取樣")
+
+
+@router.get("/{kind}.folded")
+async def profiler_download(
+    kind: str,
+    current_user=Depends(get_current_user),
+):
+    # Check if not logged in
+    if not current_user:
+        return _302_REDIRECT_TO_HOME
+
+    # Check if user is admin
+    if current_user.role != Role.ADMIN:
+        return _403_NOT_A_ADMIN
+
+    # Check if a finished session has the requested profile
+    session = sampling_profiler.session
+    if not session or not session.finished or kind not in ["cpu", "memory"]:
+        return _404_PROFILE_NOT_FOUND
+
+    stacks = session.stacks if kind == "cpu" else session.memory_stacks
+    return PlainTextResponse(
+        session.folded(stacks),
+        headers={
+            "Content-Disposition": f'attachment; filename="{session.id}-{kind}.folded"'
+        },
+    )
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from fastapi.responses import FileResponse
 from itsdangerous import BadSignature, SignatureExpired
+from re import compile
 from pathlib import Path
 
 from .depends import get_current_user
@@ -11,17 +12,82 @@ from api.response import (
     _404_QUESTION_NOT_FOUND_API,
     _404_IMAGE_FILE_NOT_FOUND_API,
 )
-from auth.image import serializer
+from auth.image import hash_serializer, serializer
 from crud.question import QuestionCrudManager
-from settings.configs import Settings
+from settings.configs import get_settings
+from utils.metrics import image_bytes_served
 
 router = APIRouter()
 QuestionCrud = QuestionCrudManager()
-settings = Settings()
+settings = get_settings()
+
+IMAGE_HASH_PATTERN = compile(r"[0-9a-f]{64}")
+
+
+def _image_response(request: Request, image_path: str, image_hash: str, headers):
+    # Check if file (image_path) exists
+    try:
+        stat_result = Path(image_path).stat()
+    except FileNotFoundError:
+        raise _404_IMAGE_FILE_NOT_FOUND_API
+
+    # Content hash as ETag (legacy images without a hash are sent as is)
+    if image_hash:
+        headers = {**headers, "ETag": f'"{image_hash}"'}
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    image_bytes_served.inc(amount=stat_result.st_size)
+    return FileResponse(
+        image_path,
+        media_type="image/jpeg",
+        stat_result=stat_result,
+        headers=headers,
+    )
+
+
+@router.get("/image/by-hash/{image_hash}")
+async def get_question_image_by_hash(
+    request: Request,
+    image_hash: str,
+    token: str = Query(...),
+    current_user=Depends(get_current_user),
+):
+    # Check if not logged in
+    if not current_user:
+        raise _403_NOT_LOGIN_API
+
+    # Validate token (not timed, the URL stays the same for the browser cache)
+    try:
+        data = hash_serializer.loads(token)
+    except BadSignature:
+        raise _403_INVALID_IMAGE_TOKEN_API
+
+    # Check if token belongs to the current user and this image
+    if data["user_id"] != str(current_user.id) or data["image_hash"] != image_hash:
+        raise _403_INVALID_IMAGE_TOKEN_API
+
+    # Check if any question uses the image
+    image_path = (
+        await QuestionCrud.get_image_path_by_hash(image_hash)
+        if IMAGE_HASH_PATTERN.fullmatch(image_hash)
+        else None
+    )
+    if not image_path:
+        raise _404_IMAGE_FILE_NOT_FOUND_API
+
+    # Same image content, same URL: cached once per user for every question using it
+    return _image_response(
+        request,
+        image_path,
+        image_hash,
+        {"Cache-Control": f"private, max-age={settings.IMAGE_CACHE_MAX_AGE}"},
+    )
 
 
 @router.get("/image/{question_id}")
 async def get_question_image(
+    request: Request,
     question_id: str,
     token: str = Query(...),
     current_user=Depends(get_current_user),
@@ -47,8 +113,4 @@ async def get_question_image(
     if not question:
         raise _404_QUESTION_NOT_FOUND_API
 
-    # Check if file (image_path) exists
-    if not Path(question.image_path).exists():
-        raise _404_IMAGE_FILE_NOT_FOUND_API
-
-    return FileResponse(question.image_path, media_type="image/jpeg")
+    return _image_response(request, question.image_path, question.image_hash, {})
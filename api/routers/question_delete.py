@@ -1,6 +1,13 @@
 from csv import DictReader
-from fastapi import APIRouter, Depends, File, Form, Request, UploadFile
-from fastapi.templating import Jinja2Templates
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    Form,
+    Request,
+    UploadFile,
+)
 from io import StringIO
 
 from .depends import get_current_user
@@ -8,11 +15,17 @@ from api.response import (
     _302_REDIRECT_TO_HOME,
     _403_NOT_A_ADMIN_OR_TEACHER,
 )
+from api.templates import templates
 from crud.question import QuestionCrudManager
 from models.base import Role
+from settings.configs import get_settings
+from utils.batch import chunked
+from utils.exam import invalidate_exam_results
+from utils.image_file import remove_unreferenced_images
+from utils.question_bank import question_bank
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
+settings = get_settings()
 
 QuestionCrud = QuestionCrudManager()
 
@@ -43,6 +56,7 @@ async def question_delete(
 @router.post("")
 async def single_question_delete_post(
     request: Request,
+    background_tasks: BackgroundTasks,
     filename: str = Form(...),
     current_user=Depends(get_current_user),
 ):
@@ -68,6 +82,9 @@ async def single_question_delete_post(
 
     # Delete the question with the given filename
     await QuestionCrud.delete_by_filename(filename)
+    question_bank.invalidate(question_to_delete.subject)
+    invalidate_exam_results([question_to_delete.id])
+    background_tasks.add_task(remove_unreferenced_images, [question_to_delete])
     return templates.TemplateResponse(
         "question_delete.html",
         {
@@ -81,6 +98,7 @@ async def single_question_delete_post(
 @router.post("/bulk")
 async def multiple_question_delete_post(
     request: Request,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     current_user=Depends(get_current_user),
 ):
@@ -104,25 +122,39 @@ async def multiple_question_delete_post(
         )
 
     # Check CSV file content and delete questions
+    deleted_subjects = set()
     try:
         content = await file.read()
         decoded_content = content.decode("utf-8")
         csv_reader = DictReader(StringIO(decoded_content))
 
+        serial_numbers = [row["serial_number"].strip() for row in csv_reader]
+
+        # Look up all questions to delete at once
+        questions = await QuestionCrud.get_by_serial_numbers(serial_numbers)
+        questions_by_serial_number = {q.serial_number: q for q in questions}
+
         success_questions = []
         error_questions = []
+        questions_to_delete = []
 
-        for row in csv_reader:
-            serial_number = row["serial_number"].strip()
-
-            question_to_delete = await QuestionCrud.get_by_filename(serial_number)
+        for serial_number in serial_numbers:
+            question_to_delete = questions_by_serial_number.pop(serial_number, None)
             if question_to_delete:
-                await QuestionCrud.delete_by_filename(serial_number)
+                questions_to_delete.append(question_to_delete)
                 success_questions.append(serial_number)
 
             else:
                 error_questions.append(serial_number)
 
+        # Delete questions chunk by chunk, image files of each committed chunk
+        # are removed after the response is sent (even if a later chunk fails)
+        for chunk in chunked(questions_to_delete, settings.BULK_DELETE_BATCH_SIZE):
+            await QuestionCrud.delete_by_ids([q.id for q in chunk])
+            deleted_subjects.update(q.subject for q in chunk)
+            invalidate_exam_results([q.id for q in chunk])
+            background_tasks.add_task(remove_unreferenced_images, chunk)
+
     except Exception:
         return templates.TemplateResponse(
             "question_delete.html",
@@ -133,6 +165,11 @@ async def multiple_question_delete_post(
             },
         )
 
+    finally:
+        # Drop pooled exam papers that may contain deleted questions
+        for subject in deleted_subjects:
+            question_bank.invalidate(subject)
+
     success_message = (
         f"已刪除題目：{', '.join(success_questions)}" if success_questions else ""
     )
@@ -1,24 +1,21 @@
-from csv import writer
 from datetime import datetime
 from fastapi import APIRouter, Depends, Form, Request
 from fastapi.responses import StreamingResponse
-from fastapi.templating import Jinja2Templates
-from io import StringIO
-from pathlib import Path
 
 from .depends import get_current_user
 from api.response import (
     _302_REDIRECT_TO_HOME,
     _403_NOT_A_ADMIN_OR_TEACHER,
 )
-from auth.image import generate_image_token
+from api.templates import templates
+from auth.image import question_image_token
 from crud.question import QuestionCrudManager
 from models.base import Role, Subject
-from settings.configs import Settings
+from settings.configs import get_settings
+from utils.export import csv_download_headers, stream_csv
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
-settings = Settings()
+settings = get_settings()
 
 QuestionCrud = QuestionCrudManager()
 
@@ -74,7 +71,9 @@ async def single_question_read_post(
 
     # Get image token and render question_read.html
     question.image_name = filename + ".jpg"
-    question.token = generate_image_token(str(current_user.id), question.id)
+    question.token = question_image_token(
+        str(current_user.id), question.id, question.image_hash
+    )
     return templates.TemplateResponse(
         "question_read.html",
         {
@@ -100,8 +99,7 @@ async def multiple_question_read_post(
         return _403_NOT_A_ADMIN_OR_TEACHER
 
     # Check if the subject has any questions
-    questions = await QuestionCrud.get_by_subject(subject)
-    if not questions:
+    if not await QuestionCrud.exists_by_subject(subject):
         return templates.TemplateResponse(
             "question_read.html",
             {
@@ -111,22 +109,21 @@ async def multiple_question_read_post(
             },
         )
 
-    # Generate CSV content
-    buffer = StringIO()
-    csv_writer = writer(buffer)
-    csv_writer.writerow(["subject", "filename", "answer"])
-
-    for q in questions:
-        filename = str(Path(q.image_path).name)[:6] + ".jpg"
-        csv_writer.writerow([q.subject, filename, q.answer])
+    # Generate CSV content while streaming questions from database
+    def format_row(q):
+        filename = q.serial_number + ".jpg"
+        return [q.subject, filename, q.answer]
 
-    buffer.seek(0)
+    csv_content = stream_csv(
+        ["subject", "filename", "answer"],
+        QuestionCrud.stream_by_subject(subject),
+        format_row,
+    )
 
     # Return CSV as downloadable file
     csv_filename = f"{subject}_questions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    csv_headers = {"Content-Disposition": f"attachment; filename={csv_filename}"}
     return StreamingResponse(
-        buffer.getvalue(),
+        csv_content,
         media_type="text/csv",
-        headers=csv_headers,
+        headers=csv_download_headers(csv_filename),
     )
@@ -1,20 +1,19 @@
-from csv import DictReader
-from fastapi import APIRouter, Depends, File, Form, Request, UploadFile
-from fastapi.templating import Jinja2Templates
-from io import StringIO
+from fastapi import APIRouter, Depends, File, Form, Request, UploadFile, status
+from fastapi.responses import RedirectResponse
 
 from .depends import get_current_user
 from api.response import (
     _302_REDIRECT_TO_HOME,
     _403_NOT_A_ADMIN_OR_TEACHER,
 )
+from api.templates import templates
 from auth.passwd import get_password_hash
 from crud.user import UserCrudManager
-from models.base import Role
+from models.base import Import_kind, Role
 from schemas import user as UserSchema
+from utils.import_jobs import import_job_runner
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
 
 UserCrud = UserCrudManager()
 
@@ -126,66 +125,9 @@ async def multiple_user_create_post(
             },
         )
 
-    # Check CSV file content and create users
-    try:
-        content = await file.read()
-        f = StringIO(content.decode("utf-8"))
-        reader = DictReader(f)
-
-        # Create users
-        success_to_add = []
-        fail_to_add = []
-        for row in reader:
-            username = row["username"].strip()
-            password = row["password"].strip()
-            name = row["name"].strip()
-            role = row["role"].strip()
-
-            # Check if user_to_add is admin
-            if role == Role.ADMIN:
-                fail_to_add.append(f"{username}(無法新增管理員帳號)")
-                continue
-
-            # Check if user with the same username already exists
-            user_to_add = await UserCrud.get_by_username(username)
-            if not user_to_add:
-                newUser = UserSchema.UserCreate(
-                    username=username,
-                    password=password,
-                    name=name,
-                    role=role,
-                )
-                newUser.password = get_password_hash(newUser.password)
-                await UserCrud.create(newUser)
-                success_to_add.append(username)
-            else:
-                fail_to_add.append(username)
-
-    except Exception:
-        return templates.TemplateResponse(
-            "user_create.html",
-            {
-                "request": request,
-                "current_user": current_user,
-                "error_multiple": "CSV 檔案格式錯誤，請確認檔案內容",
-            },
-        )
-
-    # Render user_create.html
-    success_message = (
-        f"以下使用者新增成功：{', '.join(success_to_add)}" if success_to_add else ""
-    )
-
-    error_message = (
-        (f"以下使用者新增失敗：{', '.join(fail_to_add)}") if fail_to_add else ""
-    )
-
-    return templates.TemplateResponse(
-        "user_create.html",
-        {
-            "request": request,
-            "current_user": current_user,
-            "success_multiple": success_message,
-            "error_multiple": error_message,
-        },
+    # Import in the background, follow the progress on the job page
+    job = await import_job_runner.submit(current_user.id, Import_kind.USER, file)
+    return RedirectResponse(
+        f"/import/job/{job.id}",
+        status_code=status.HTTP_303_SEE_OTHER,
     )
@@ -1,20 +1,23 @@
 from csv import DictReader
 from fastapi import APIRouter, Depends, File, Form, Request, UploadFile
-from fastapi.templating import Jinja2Templates
 from io import StringIO
+from logging import getLogger
 
 from .depends import get_current_user
 from api.response import (
     _302_REDIRECT_TO_HOME,
     _403_NOT_A_ADMIN_OR_TEACHER,
 )
+from api.templates import templates
 from crud.user import UserCrudManager
 from models.base import Role
-from settings.configs import Settings
+from settings.configs import get_settings
+from utils.batch import chunked
+from utils.exam import forget_user_exam_results
 
+logger = getLogger(__name__)
 router = APIRouter()
-settings = Settings()
-templates = Jinja2Templates(directory="templates")
+settings = get_settings()
 
 UserCrud = UserCrudManager()
 
@@ -81,6 +84,7 @@ async def single_user_delete_post(
 
     # Delete the user
     await UserCrud.delete_by_username(username)
+    forget_user_exam_results([user_to_delete.id])
     return templates.TemplateResponse(
         "user_delete.html",
         {
@@ -122,21 +126,24 @@ async def multiple_user_delete_post(
         decoded_content = content.decode("utf-8")
         csv_reader = DictReader(StringIO(decoded_content))
 
-        success_usernames = []
-        error_usernames = []
+        usernames = [row["username"].strip() for row in csv_reader]
+
+        # Look up all users to delete at once
+        users = await UserCrud.get_by_usernames(usernames)
+        users_by_username = {user.username: user for user in users}
 
-        for row in csv_reader:
-            username = row["username"].strip()
+        error_usernames = []
+        users_to_delete = []
 
+        for username in usernames:
             # Prevent deletion of admin account
             if username == settings.ADMIN_USERNAME:
                 error_usernames.append(username)
                 continue
 
-            user_to_delete = await UserCrud.get_by_username(username)
+            user_to_delete = users_by_username.pop(username, None)
             if user_to_delete:
-                await UserCrud.delete_by_username(username)
-                success_usernames.append(username)
+                users_to_delete.append(user_to_delete)
 
             else:
                 error_usernames.append(username)
@@ -151,12 +158,40 @@ async def multiple_user_delete_post(
             },
         )
 
-    success_message = (
-        f"已刪除使用者帳號：{', '.join(success_usernames)}" if success_usernames else ""
+    error_message = (
+        f"找不到使用者帳號：{', '.join(error_usernames)}" if error_usernames else ""
     )
 
-    error_message = (
-        (f"找不到使用者帳號：{', '.join(error_usernames)}") if error_usernames else ""
+    # Delete users (and their exam records) chunk by chunk, report how far it got
+    deleted_usernames = []
+    try:
+        for chunk in chunked(users_to_delete, settings.BULK_DELETE_BATCH_SIZE):
+            user_ids = [user.id for user in chunk]
+            await UserCrud.delete_by_ids(user_ids)
+            forget_user_exam_results(user_ids)
+            deleted_usernames.extend(user.username for user in chunk)
+
+    except Exception:
+        logger.exception(
+            "Bulk user delete stopped after %d users", len(deleted_usernames)
+        )
+        remaining_usernames = [
+            user.username for user in users_to_delete[len(deleted_usernames) :]
+        ]
+        error_message = "；".join(
+            message
+            for message in [
+                error_message,
+                f"刪除中斷，以下使用者帳號未刪除：{', '.join(remaining_usernames)}",
+            ]
+            if message
+        )
+
+    success_message = (
+        f"已刪除 {len(deleted_usernames)}/{len(users_to_delete)} 位使用者帳號："
+        f"{', '.join(deleted_usernames)}"
+        if deleted_usernames
+        else ""
     )
 
     return templates.TemplateResponse(
@@ -1,21 +1,22 @@
-from csv import writer
 from datetime import datetime
 from fastapi import APIRouter, Depends, Form, Request
 from fastapi.responses import StreamingResponse
-from fastapi.templating import Jinja2Templates
-from io import StringIO
 
 from .depends import get_current_user
 from api.response import (
     _302_REDIRECT_TO_HOME,
     _403_NOT_A_ADMIN_OR_TEACHER,
 )
+from api.templates import templates
 from crud.user import UserCrudManager
 from models.base import Role
-from utils.exam import get_exam_render_info
+from settings.configs import get_settings
+from utils.exam import GRADEBOOK_HEADER, get_exam_records_html, stream_gradebook_rows
+from utils.export import csv_download_headers, stream_csv
+from utils.pagination import decode_cursor
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
+settings = get_settings()
 
 UserCrud = UserCrudManager()
 
@@ -43,6 +44,35 @@ async def user_read(
     )
 
 
+@router.get("/list")
+async def user_list(
+    request: Request,
+    cursor: str = "",
+    current_user=Depends(get_current_user),
+):
+    # Check if not logged in
+    if not current_user:
+        return _302_REDIRECT_TO_HOME
+
+    # Check if user is teacher or admin
+    if current_user.role not in [Role.TEACHER, Role.ADMIN]:
+        return _403_NOT_A_ADMIN_OR_TEACHER
+
+    # Render user_list.html (one page of students after the cursor)
+    users, next_cursor = await UserCrud.get_page(
+        Role.STUDENT, settings.USER_LIST_PAGE_SIZE, decode_cursor(cursor)
+    )
+    return templates.TemplateResponse(
+        "user_list.html",
+        {
+            "request": request,
+            "current_user": current_user,
+            "users": users,
+            "next_cursor": next_cursor,
+        },
+    )
+
+
 @router.post("")
 async def single_user_read_post(
     request: Request,
@@ -87,7 +117,9 @@ async def single_user_read_post(
             "request": request,
             "current_user": current_user,
             "student_info": user_to_read,
-            "exam_lists": await get_exam_render_info(user_to_read.id),
+            "exam_records": await get_exam_records_html(
+                user_to_read.id, templates.get_template("dashboard_exam_records.html")
+            ),
         },
     )
 
@@ -104,22 +136,40 @@ async def multiple_user_read_post(
     if current_user.role not in [Role.TEACHER, Role.ADMIN]:
         return _403_NOT_A_ADMIN_OR_TEACHER
 
-    # Generate CSV content
-    buffer = StringIO()
-    csv_writer = writer(buffer)
-    csv_writer.writerow(["username", "name", "role", "created_at"])
+    # Generate CSV content while streaming users from database
+    csv_content = stream_csv(
+        ["username", "name", "role", "created_at"],
+        UserCrud.stream_all(),
+    )
 
-    all_users = await UserCrud.get_all()
-    for user in all_users:
-        csv_writer.writerow([user.username, user.name, user.role, user.created_at])
+    # Return CSV as downloadable file
+    csv_filename = f"all_users_info_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    return StreamingResponse(
+        csv_content,
+        media_type="text/csv",
+        headers=csv_download_headers(csv_filename),
+    )
 
-    buffer.seek(0)
+
+@router.post("/gradebook")
+async def gradebook_export_post(
+    current_user=Depends(get_current_user),
+):
+    # Check if not logged in
+    if not current_user:
+        return _302_REDIRECT_TO_HOME
+
+    # Check if user is teacher or admin
+    if current_user.role not in [Role.TEACHER, Role.ADMIN]:
+        return _403_NOT_A_ADMIN_OR_TEACHER
+
+    # Generate CSV content while streaming aggregated exam records
+    csv_content = stream_csv(GRADEBOOK_HEADER, stream_gradebook_rows())
 
     # Return CSV as downloadable file
-    csv_filename = f"all_users_info_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    csv_headers = {"Content-Disposition": f"attachment; filename={csv_filename}"}
+    csv_filename = f"gradebook_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
     return StreamingResponse(
-        buffer.getvalue(),
+        csv_content,
         media_type="text/csv",
-        headers=csv_headers,
+        headers=csv_download_headers(csv_filename),
     )
@@ -0,0 +1,108 @@
+from json import load
+from os.path import exists, join
+
+from fastapi.staticfiles import StaticFiles
+from jinja2 import pass_context
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+
+from settings.configs import get_settings
+
+settings = get_settings()
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+PRECOMPRESSED_ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+def load_static_manifest():
+    # 原始檔名 -> 含內容雜湊的檔名 (由 python -m utils.static_build 產生)
+    manifest_path = join(
+        settings.STATIC_DIR, settings.STATIC_DIST_DIRNAME, "manifest.json"
+    )
+    if not exists(manifest_path):
+        return {}
+
+    with open(manifest_path) as file:
+        return load(file)
+
+
+static_manifest = load_static_manifest()
+
+
+@pass_context
+def static_url(context, path: str):
+    return context["request"].url_for("static", path=static_manifest.get(path, path))
+
+
+class FingerprintedStaticFiles(StaticFiles):
+    """
+    含內容雜湊的檔案 (dist/ 下) 以長期不變的快取標頭回應，
+    並優先回傳預先壓縮的 .br / .gz 檔。
+    """
+
+    async def get_response(self, path: str, scope):
+        if not path.startswith(settings.STATIC_DIST_DIRNAME + "/"):
+            response = await super().get_response(path, scope)
+            response.headers.setdefault("Cache-Control", "no-cache")
+            return response
+
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding not in accept_encoding:
+                continue
+            try:
+                response = await super().get_response(path + suffix, scope)
+            except HTTPException:
+                continue
+            response.headers["Content-Encoding"] = encoding
+            break
+        else:
+            response = await super().get_response(path, scope)
+
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        response.headers.add_vary_header("Accept-Encoding")
+        return response
+
+
+class _ContentTypeGZipResponder(GZipResponder):
+    def __init__(self, app, minimum_size: int, content_types, compresslevel: int):
+        super().__init__(app, minimum_size, compresslevel=compresslevel)
+        self.content_types = content_types
+
+    async def send_with_gzip(self, message):
+        await super().send_with_gzip(message)
+
+        # Pass other content types through unchanged (same as already encoded)
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            if content_type.split(";")[0].strip() not in self.content_types:
+                self.content_encoding_set = True
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """只壓縮超過 minimum_size 的動態 HTML / CSV 回應。"""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        content_types=("text/html", "text/csv"),
+        compresslevel: int = 6,
+    ):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.content_types = frozenset(content_types)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            headers = Headers(scope=scope)
+            if "gzip" in headers.get("Accept-Encoding", ""):
+                responder = _ContentTypeGZipResponder(
+                    self.app,
+                    self.minimum_size,
+                    self.content_types,
+                    compresslevel=self.compresslevel,
+                )
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
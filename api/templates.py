@@ -0,0 +1,26 @@
+from os import makedirs
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from settings.configs import get_settings
+from .static import static_url
+
+settings = get_settings()
+
+# 所有路由共用的模板環境，編譯結果存於 bytecode cache 供各 worker 重複使用
+makedirs(settings.TEMPLATES_BYTECODE_CACHE_DIR, exist_ok=True)
+env = Environment(
+    loader=FileSystemLoader(settings.TEMPLATES_DIR),
+    autoescape=True,
+    auto_reload=settings.TEMPLATES_AUTO_RELOAD,
+    bytecode_cache=FileSystemBytecodeCache(settings.TEMPLATES_BYTECODE_CACHE_DIR),
+)
+env.globals["static_url"] = static_url
+templates = Jinja2Templates(env=env)
+
+
+# 啟動時預先編譯所有模板，避免第一次請求時才解析
+def precompile_templates():
+    for name in env.list_templates(extensions=["html"]):
+        env.get_template(name)
@@ -1,13 +1,29 @@
-from itsdangerous import URLSafeTimedSerializer
+from itsdangerous import URLSafeSerializer, URLSafeTimedSerializer
 
-from settings.configs import Settings
+from settings.configs import get_settings
 
-settings = Settings()
+settings = get_settings()
 serializer = URLSafeTimedSerializer(
     settings.IMAGE_SECRET_KEY,
     salt="image-salt",
 )
+# Not timed: the same user gets the same URL for the same image (browser cacheable)
+hash_serializer = URLSafeSerializer(
+    settings.IMAGE_SECRET_KEY,
+    salt="image-hash-salt",
+)
 
 
 def generate_image_token(user_id: str, question_id: str):
     return serializer.dumps({"user_id": user_id, "question_id": question_id})
+
+
+def generate_image_hash_token(user_id: str, image_hash: str):
+    return hash_serializer.dumps({"user_id": user_id, "image_hash": image_hash})
+
+
+# 圖片庫中的圖片以雜湊值的網址提供，尚未搬移的舊圖片以題目 id 的網址提供
+def question_image_token(user_id: str, question_id: str, image_hash: str):
+    if image_hash:
+        return generate_image_hash_token(user_id, image_hash)
+    return generate_image_token(user_id, question_id)
@@ -1,11 +1,22 @@
-from passlib.context import CryptContext
+from functools import lru_cache
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from utils.lazy import lazy_import
+from utils.metrics import track_bcrypt
+
+passlib_context = lazy_import("passlib.context")
+
+
+# bcrypt 只在登入及建立使用者時使用，第一次使用時才建立
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    return passlib_context.CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    with track_bcrypt("verify"):
+        return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    with track_bcrypt("hash"):
+        return get_pwd_context().hash(password)
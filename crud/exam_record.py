@@ -1,13 +1,29 @@
-from sqlalchemy import select, delete
+from sqlalchemy import case, delete, func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from auth.image import generate_image_token
-from crud.question import QuestionCrudManager
 from database.mysql import crud_class_decorator
+from models.base import Role
+from models.exam_answer import ExamAnswer as ExamAnswerModel
 from models.exam_record import ExamRecord as ExamRecordModel
+from models.question import Question as QuestionModel
+from models.user import User as UserModel
 from schemas import exam_record as ExamRecordSchema
+from utils.dashboard import bump_dashboard_version
+from utils.pagination import after_cursor, next_cursor
 
-QuestionCrud = QuestionCrudManager()
+
+# 將作答內容展開為 ExamAnswer 資料列 (answer_keys: question_id -> 正確答案)
+def exam_answer_rows(exam_record_id: str, user_answers: list[dict], answer_keys: dict):
+    return [
+        {
+            "exam_record_id": exam_record_id,
+            "question_id": item["question_id"],
+            "position": position,
+            "user_answer": item["user_answer"],
+            "is_correct": answer_keys.get(item["question_id"]) == item["user_answer"],
+        }
+        for position, item in enumerate(user_answers)
+    ]
 
 
 @crud_class_decorator
@@ -16,27 +32,75 @@ class ExamRecordCrudManager:
         self,
         user_id: str,
         newExamRecord: ExamRecordSchema.ExamRecordCreate,
+        answer_keys: dict,
         db_session: AsyncSession,
     ):
-        # Calculate score
-        score = 0
-        for item in newExamRecord.user_answers:
-            question = await QuestionCrud.get(item.question_id)
-            if question and question.answer == item.user_answer:
-                score += 1
-
         # Create new exam record
         exam_record = ExamRecordModel(
             user_id=user_id,
             exam_type=newExamRecord.exam_type,
-            score=score,
+            score=0,
             user_answers=newExamRecord.user_answers,
         )
+        answer_rows = exam_answer_rows(
+            exam_record.id, exam_record.user_answers, answer_keys
+        )
+        exam_record.score = sum(row["is_correct"] for row in answer_rows)
         db_session.add(exam_record)
+        await db_session.flush()
+
+        # Bulk insert normalized answers
+        if answer_rows:
+            await db_session.execute(insert(ExamAnswerModel), answer_rows)
         await db_session.commit()
+        bump_dashboard_version(user_id)
 
         return exam_record
 
+    async def create_many(
+        self,
+        exam_records: list[dict],
+        db_session: AsyncSession,
+    ):
+        # Skip records inserted before (queue replayed after an interrupted flush)
+        stmt = select(ExamRecordModel.id).where(
+            ExamRecordModel.id.in_([record["id"] for record in exam_records])
+        )
+        result = await db_session.execute(stmt)
+        existing_ids = set(result.scalars().all())
+        new_records = [
+            record for record in exam_records if record["id"] not in existing_ids
+        ]
+
+        # Multi-row inserts of records and their normalized answers
+        if new_records:
+            await db_session.execute(
+                insert(ExamRecordModel),
+                [
+                    {
+                        "id": record["id"],
+                        "user_id": record["user_id"],
+                        "exam_type": record["exam_type"],
+                        "score": record["score"],
+                        "question_count": len(record["user_answers"]),
+                        "user_answers": record["user_answers"],
+                        "created_at": record["created_at"],
+                    }
+                    for record in new_records
+                ],
+            )
+            answer_rows = [
+                row for record in new_records for row in record["answer_rows"]
+            ]
+            if answer_rows:
+                await db_session.execute(insert(ExamAnswerModel), answer_rows)
+        await db_session.commit()
+
+        for user_id in {record["user_id"] for record in new_records}:
+            bump_dashboard_version(user_id)
+
+        return len(new_records)
+
     async def get(
         self,
         exam_record_id: str,
@@ -59,29 +123,239 @@ class ExamRecordCrudManager:
 
         return exam_records
     
-    async def get_rendered_user_answers_data(
+    async def get_page_by_user_id(
         self,
         user_id: str,
-        exam_record_id: str,
+        exam_type: str,
+        limit: int,
+        cursor: tuple,
         db_session: AsyncSession,
     ):
-        exam_record = await self.get(exam_record_id)
-        if not exam_record:
-            return None
-
-        rendered_user_answers = []
-        for item in exam_record.user_answers:
-            question = await QuestionCrud.get(item["question_id"])
-            if question:
-                rendered_user_answers.append(
-                    {
-                        "question_id": item["question_id"],
-                        "image_path": question.image_path,
-                        "answer": question.answer,
-                        "user_answer": item["user_answer"],
-                        "is_correct": question.answer == item["user_answer"],
-                        "token": generate_image_token(str(user_id), question.id),
-                    }
+        # Newest first, continuing after the (created_at, id) cursor
+        stmt = select(
+            ExamRecordModel.id,
+            ExamRecordModel.score,
+            ExamRecordModel.question_count,
+            ExamRecordModel.created_at,
+        ).where(
+            ExamRecordModel.user_id == user_id,
+            ExamRecordModel.exam_type == exam_type,
+        )
+        if cursor:
+            stmt = stmt.where(
+                after_cursor(
+                    ExamRecordModel.created_at,
+                    ExamRecordModel.id,
+                    cursor,
+                    descending=True,
                 )
+            )
+        stmt = stmt.order_by(
+            ExamRecordModel.created_at.desc(), ExamRecordModel.id.desc()
+        ).limit(limit + 1)
+        result = await db_session.execute(stmt)
+
+        return next_cursor(result.all(), limit)
+
+    async def get_summary_by_user_id(
+        self,
+        user_id: str,
+        db_session: AsyncSession,
+    ):
+        stmt = (
+            select(
+                ExamRecordModel.exam_type,
+                func.sum(ExamRecordModel.score).label("all_correct"),
+                func.coalesce(func.sum(ExamRecordModel.question_count), 0).label(
+                    "all_questions"
+                ),
+            )
+            .where(ExamRecordModel.user_id == user_id)
+            .group_by(ExamRecordModel.exam_type)
+        )
+        result = await db_session.execute(stmt)
+        summaries = result.all()
+
+        return summaries
+
+    async def stream_gradebook(
+        self,
+        db_session: AsyncSession,
+        chunk_size: int = 1000,
+    ):
+        # Rank each student's records per exam type, newest first
+        ranked = select(
+            ExamRecordModel.user_id,
+            ExamRecordModel.exam_type,
+            ExamRecordModel.score,
+            ExamRecordModel.question_count,
+            func.row_number()
+            .over(
+                partition_by=(ExamRecordModel.user_id, ExamRecordModel.exam_type),
+                order_by=(ExamRecordModel.created_at.desc(), ExamRecordModel.id.desc()),
+            )
+            .label("recency"),
+        ).subquery()
+
+        # One row per (student, exam_type), students without records included
+        stmt = (
+            select(
+                UserModel.id.label("user_id"),
+                UserModel.username,
+                UserModel.name,
+                ranked.c.exam_type,
+                func.count(ranked.c.score).label("attempts"),
+                func.max(ranked.c.score).label("best_score"),
+                func.max(case((ranked.c.recency == 1, ranked.c.score))).label(
+                    "latest_score"
+                ),
+                func.sum(ranked.c.score).label("all_correct"),
+                func.sum(ranked.c.question_count).label("all_questions"),
+            )
+            .outerjoin(ranked, ranked.c.user_id == UserModel.id)
+            .where(UserModel.role == Role.STUDENT)
+            .group_by(
+                UserModel.id,
+                UserModel.username,
+                UserModel.name,
+                ranked.c.exam_type,
+            )
+            .order_by(UserModel.username, UserModel.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await db_session.stream(stmt)
+        async for rows in result.partitions():
+            yield rows
+
+    async def stream_answers_by_subject(
+        self,
+        subject: str,
+        db_session: AsyncSession,
+        chunk_size: int = 10000,
+    ):
+        stmt = (
+            select(
+                ExamAnswerModel.exam_record_id,
+                ExamAnswerModel.question_id,
+                ExamAnswerModel.user_answer,
+                ExamAnswerModel.is_correct,
+            )
+            .join(QuestionModel, QuestionModel.id == ExamAnswerModel.question_id)
+            .where(QuestionModel.subject == subject)
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await db_session.stream(stmt)
+        async for rows in result.partitions():
+            yield rows
+
+    async def stream_answer_history(
+        self,
+        user_id: str,
+        subject: str,
+        db_session: AsyncSession,
+        chunk_size: int = 5000,
+    ):
+        stmt = (
+            select(
+                ExamAnswerModel.question_id,
+                ExamAnswerModel.is_correct,
+                ExamRecordModel.created_at,
+            )
+            .join(ExamRecordModel, ExamRecordModel.id == ExamAnswerModel.exam_record_id)
+            .join(QuestionModel, QuestionModel.id == ExamAnswerModel.question_id)
+            .where(ExamRecordModel.user_id == user_id, QuestionModel.subject == subject)
+            .order_by(ExamRecordModel.created_at)
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await db_session.stream(stmt)
+        async for rows in result.partitions():
+            yield rows
+
+    async def get_with_answer_keys(
+        self,
+        exam_record_id: str,
+        db_session: AsyncSession,
+    ):
+        # Record joined with its normalized answers and their answer keys
+        stmt = (
+            select(ExamRecordModel, ExamAnswerModel.question_id, QuestionModel.answer)
+            .outerjoin(
+                ExamAnswerModel,
+                ExamAnswerModel.exam_record_id == ExamRecordModel.id,
+            )
+            .outerjoin(QuestionModel, QuestionModel.id == ExamAnswerModel.question_id)
+            .where(ExamRecordModel.id == exam_record_id)
+        )
+        result = await db_session.execute(stmt)
+        rows = result.all()
+        if not rows:
+            return None, {}
+
+        exam_record = rows[0][0]
+        answer_keys = {
+            question_id: answer
+            for _, question_id, answer in rows
+            if answer is not None
+        }
+        if rows[0][1] or not exam_record.user_answers:
+            return exam_record, answer_keys
+
+        # Records not backfilled into ExamAnswer yet (primary key lookup)
+        question_ids = [item["question_id"] for item in exam_record.user_answers]
+        stmt = select(QuestionModel.id, QuestionModel.answer).where(
+            QuestionModel.id.in_(question_ids)
+        )
+        result = await db_session.execute(stmt)
+        answer_keys = dict(result.all())
+
+        return exam_record, answer_keys
+
+    async def get_without_answers(
+        self,
+        after_id: str,
+        limit: int,
+        db_session: AsyncSession,
+    ):
+        has_answers = select(ExamAnswerModel.exam_record_id).where(
+            ExamAnswerModel.exam_record_id == ExamRecordModel.id
+        )
+        stmt = (
+            select(ExamRecordModel.id, ExamRecordModel.user_answers)
+            .where(ExamRecordModel.id > after_id, ~has_answers.exists())
+            .order_by(ExamRecordModel.id)
+            .limit(limit)
+        )
+        result = await db_session.execute(stmt)
+        exam_records = result.all()
+
+        return exam_records
+
+    async def create_answers(
+        self,
+        exam_records: list,
+        db_session: AsyncSession,
+    ):
+        # Answer keys of all questions in the given records
+        question_ids = {
+            item["question_id"]
+            for exam_record in exam_records
+            for item in exam_record.user_answers
+        }
+        stmt = select(QuestionModel.id, QuestionModel.answer).where(
+            QuestionModel.id.in_(question_ids)
+        )
+        result = await db_session.execute(stmt)
+        answer_keys = dict(result.all())
+
+        answer_rows = [
+            row
+            for exam_record in exam_records
+            for row in exam_answer_rows(
+                exam_record.id, exam_record.user_answers, answer_keys
+            )
+        ]
+        if answer_rows:
+            await db_session.execute(insert(ExamAnswerModel), answer_rows)
+        await db_session.commit()
 
-        return rendered_user_answers
+        return len(answer_rows)
@@ -0,0 +1,61 @@
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.mysql import crud_class_decorator
+from models.exam_seen_question import ExamSeenQuestion as ExamSeenQuestionModel
+
+
+@crud_class_decorator
+class ExamSeenQuestionCrudManager:
+    async def get_question_ids(
+        self,
+        user_id: str,
+        exam_type: str,
+        db_session: AsyncSession,
+    ):
+        stmt = select(ExamSeenQuestionModel.question_id).where(
+            ExamSeenQuestionModel.user_id == user_id,
+            ExamSeenQuestionModel.exam_type == exam_type,
+        )
+        result = await db_session.execute(stmt)
+        question_ids = result.scalars().all()
+
+        return question_ids
+
+    async def add(
+        self,
+        user_id: str,
+        exam_type: str,
+        question_ids: list[str],
+        new_round: bool,
+        db_session: AsyncSession,
+    ):
+        condition = (
+            ExamSeenQuestionModel.user_id == user_id,
+            ExamSeenQuestionModel.exam_type == exam_type,
+        )
+
+        # A new round starts from an empty set
+        if new_round:
+            await db_session.execute(delete(ExamSeenQuestionModel).where(*condition))
+
+        # Skip questions recorded meanwhile (concurrent exams of the same student)
+        else:
+            stmt = select(ExamSeenQuestionModel.question_id).where(
+                *condition, ExamSeenQuestionModel.question_id.in_(question_ids)
+            )
+            result = await db_session.execute(stmt)
+            existing_ids = set(result.scalars().all())
+            question_ids = [qid for qid in question_ids if qid not in existing_ids]
+
+        if question_ids:
+            await db_session.execute(
+                insert(ExamSeenQuestionModel),
+                [
+                    {"user_id": user_id, "exam_type": exam_type, "question_id": qid}
+                    for qid in question_ids
+                ],
+            )
+        await db_session.commit()
+
+        return
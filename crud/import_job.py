@@ -0,0 +1,124 @@
+from datetime import datetime
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.mysql import crud_class_decorator
+from models.base import Import_status
+from models.import_job import ImportJob as ImportJobModel
+from models.import_job import ImportJobFailure as ImportJobFailureModel
+
+
+@crud_class_decorator
+class ImportJobCrudManager:
+    async def create(
+        self,
+        created_by: str,
+        kind: str,
+        filename: str,
+        upload_path: str,
+        db_session: AsyncSession,
+        id: str = None,
+    ):
+        job = ImportJobModel(
+            id=id,
+            created_by=created_by,
+            kind=kind,
+            filename=filename,
+            upload_path=upload_path,
+        )
+        db_session.add(job)
+        await db_session.commit()
+
+        return job
+
+    async def get(
+        self,
+        job_id: str,
+        db_session: AsyncSession,
+    ):
+        stmt = select(ImportJobModel).where(ImportJobModel.id == job_id)
+        result = await db_session.execute(stmt)
+        job = result.scalar_one_or_none()
+
+        return job
+
+    async def get_unfinished(
+        self,
+        db_session: AsyncSession,
+    ):
+        # Oldest first, resumed in submission order
+        stmt = (
+            select(ImportJobModel)
+            .where(
+                ImportJobModel.status.in_(
+                    [Import_status.PENDING, Import_status.RUNNING]
+                )
+            )
+            .order_by(ImportJobModel.created_at)
+        )
+        result = await db_session.execute(stmt)
+        jobs = result.scalars().all()
+
+        return jobs
+
+    async def get_failures(
+        self,
+        job_id: str,
+        db_session: AsyncSession,
+    ):
+        stmt = (
+            select(
+                ImportJobFailureModel.row_number,
+                ImportJobFailureModel.item,
+                ImportJobFailureModel.reason,
+            )
+            .where(ImportJobFailureModel.job_id == job_id)
+            .order_by(ImportJobFailureModel.row_number)
+        )
+        result = await db_session.execute(stmt)
+        failures = result.all()
+
+        return failures
+
+    async def update_status(
+        self,
+        job_id: str,
+        db_session: AsyncSession,
+        **values,
+    ):
+        stmt = (
+            update(ImportJobModel)
+            .where(ImportJobModel.id == job_id)
+            .values(**values, updated_at=datetime.now())
+        )
+        await db_session.execute(stmt)
+        await db_session.commit()
+
+    async def record_progress(
+        self,
+        job_id: str,
+        processed: int,
+        succeeded: int,
+        failed: int,
+        failures: list[dict],
+        db_session: AsyncSession,
+    ):
+        # Counters and the failed rows since the last checkpoint in one transaction,
+        # so a resumed job never records the same row twice
+        if failures:
+            await db_session.execute(
+                insert(ImportJobFailureModel),
+                [{"job_id": job_id, **failure} for failure in failures],
+            )
+        stmt = (
+            update(ImportJobModel)
+            .where(ImportJobModel.id == job_id)
+            .values(
+                processed=processed,
+                succeeded=succeeded,
+                failed=failed,
+                updated_at=datetime.now(),
+            )
+        )
+        await db_session.execute(stmt)
+        await db_session.commit()
@@ -1,8 +1,9 @@
-from sqlalchemy import select, delete
+from sqlalchemy import bindparam, delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.mysql import crud_class_decorator
 from models.question import Question as QuestionModel
+from utils.batch import chunked
 
 
 @crud_class_decorator
@@ -11,14 +12,18 @@ class QuestionCrudManager:
         self,
         id: str,
         subject: str,
+        serial_number: str,
         image_path: str,
+        image_hash: str,
         answer: str,
         db_session: AsyncSession,
     ):
         question = QuestionModel(
             id=id,
             subject=subject,
+            serial_number=serial_number,
             image_path=image_path,
+            image_hash=image_hash,
             answer=answer,
         )
         db_session.add(question)
@@ -48,23 +53,217 @@ class QuestionCrudManager:
 
         return questions
 
+    async def exists_by_subject(
+        self,
+        subject: str,
+        db_session: AsyncSession,
+    ):
+        stmt = select(QuestionModel.id).where(QuestionModel.subject == subject).limit(1)
+        result = await db_session.execute(stmt)
+        question_id = result.scalar_one_or_none()
+
+        return question_id is not None
+
+    async def stream_by_subject(
+        self,
+        subject: str,
+        db_session: AsyncSession,
+        chunk_size: int = 1000,
+    ):
+        stmt = (
+            select(
+                QuestionModel.subject,
+                QuestionModel.serial_number,
+                QuestionModel.answer,
+            )
+            .where(QuestionModel.subject == subject)
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await db_session.stream(stmt)
+        async for rows in result.partitions():
+            yield rows
+
+    async def get_answer_keys_by_subject(
+        self,
+        subject: str,
+        db_session: AsyncSession,
+    ):
+        stmt = select(
+            QuestionModel.id,
+            QuestionModel.answer,
+            QuestionModel.image_hash,
+        ).where(QuestionModel.subject == subject)
+        result = await db_session.execute(stmt)
+        rows = result.all()
+
+        return rows
+
     async def get_by_filename(
         self,
         filename: str,
         db_session: AsyncSession,
     ):
-        stmt = select(QuestionModel).where(QuestionModel.image_path.contains(filename))
+        # Image files are named by content hash, look up by serial number instead
+        stmt = select(QuestionModel).where(QuestionModel.serial_number == filename)
         result = await db_session.execute(stmt)
         question = result.scalar_one_or_none()
 
         return question
 
+    async def get_by_serial_numbers(
+        self,
+        serial_numbers: list[str],
+        db_session: AsyncSession,
+        chunk_size: int = 1000,
+    ):
+        questions = []
+        for chunk in chunked(set(serial_numbers), chunk_size):
+            stmt = select(
+                QuestionModel.id,
+                QuestionModel.subject,
+                QuestionModel.serial_number,
+                QuestionModel.image_path,
+                QuestionModel.image_hash,
+            ).where(QuestionModel.serial_number.in_(chunk))
+            result = await db_session.execute(stmt)
+            questions.extend(result.all())
+
+        return questions
+
+    async def get_image_paths_by_ids(
+        self,
+        question_ids: list[str],
+        db_session: AsyncSession,
+    ):
+        stmt = select(QuestionModel.id, QuestionModel.image_path).where(
+            QuestionModel.id.in_(question_ids)
+        )
+        result = await db_session.execute(stmt)
+        rows = result.all()
+
+        return rows
+
+    async def get_referenced_image_hashes(
+        self,
+        image_hashes: list[str],
+        db_session: AsyncSession,
+        chunk_size: int = 1000,
+    ):
+        referenced = set()
+        for chunk in chunked(set(image_hashes) - {None}, chunk_size):
+            stmt = (
+                select(QuestionModel.image_hash)
+                .where(QuestionModel.image_hash.in_(chunk))
+                .distinct()
+            )
+            result = await db_session.execute(stmt)
+            referenced.update(result.scalars().all())
+
+        return referenced
+
+    async def get_image_path_by_hash(
+        self,
+        image_hash: str,
+        db_session: AsyncSession,
+    ):
+        stmt = (
+            select(QuestionModel.image_path)
+            .where(QuestionModel.image_hash == image_hash)
+            .limit(1)
+        )
+        result = await db_session.execute(stmt)
+        image_path = result.scalar_one_or_none()
+
+        return image_path
+
+    async def get_image_page(
+        self,
+        after_id: str,
+        limit: int,
+        db_session: AsyncSession,
+    ):
+        # Keyset page by id, used by the image layout migration
+        stmt = select(
+            QuestionModel.id,
+            QuestionModel.image_path,
+            QuestionModel.image_hash,
+        )
+        if after_id:
+            stmt = stmt.where(QuestionModel.id > after_id)
+        stmt = stmt.order_by(QuestionModel.id).limit(limit)
+        result = await db_session.execute(stmt)
+        rows = result.all()
+
+        return rows
+
+    async def get_image_paths_by_hashes(
+        self,
+        image_hashes: list[str],
+        db_session: AsyncSession,
+        chunk_size: int = 1000,
+    ):
+        image_paths = set()
+        for chunk in chunked(set(image_hashes), chunk_size):
+            stmt = select(QuestionModel.image_path).where(
+                QuestionModel.image_hash.in_(chunk)
+            )
+            result = await db_session.execute(stmt)
+            image_paths.update(result.scalars().all())
+
+        return image_paths
+
+    async def update_image_paths(
+        self,
+        updates: list[dict],
+        db_session: AsyncSession,
+    ):
+        # Only rows still pointing at the old path (not deleted or moved meanwhile)
+        table = QuestionModel.__table__
+        stmt = (
+            update(table)
+            .where(
+                table.c.id == bindparam("question_id"),
+                table.c.image_path == bindparam("old_image_path"),
+            )
+            .values(
+                image_path=bindparam("new_image_path"),
+                image_hash=bindparam("new_image_hash"),
+            )
+        )
+        await db_session.execute(stmt, updates)
+        await db_session.commit()
+
+        return
+
+    async def stream_image_paths(
+        self,
+        db_session: AsyncSession,
+        chunk_size: int = 1000,
+    ):
+        stmt = select(QuestionModel.id, QuestionModel.image_path).execution_options(
+            yield_per=chunk_size
+        )
+        result = await db_session.stream(stmt)
+        async for rows in result.partitions():
+            yield rows
+
     async def delete_by_filename(
         self,
         filename: str,
         db_session: AsyncSession,
     ):
-        stmt = delete(QuestionModel).where(QuestionModel.image_path.contains(filename))
+        stmt = delete(QuestionModel).where(QuestionModel.serial_number == filename)
+        await db_session.execute(stmt)
+        await db_session.commit()
+
+        return
+
+    async def delete_by_ids(
+        self,
+        question_ids: list[str],
+        db_session: AsyncSession,
+    ):
+        stmt = delete(QuestionModel).where(QuestionModel.id.in_(question_ids))
         await db_session.execute(stmt)
         await db_session.commit()
 
@@ -2,8 +2,14 @@ from sqlalchemy import select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.mysql import crud_class_decorator
+from models.exam_answer import ExamAnswer as ExamAnswerModel
+from models.exam_record import ExamRecord as ExamRecordModel
+from models.exam_seen_question import ExamSeenQuestion as ExamSeenQuestionModel
 from models.user import User as UserModel
 from schemas import user as UserSchema
+from utils.batch import chunked
+from utils.dashboard import forget_dashboards
+from utils.pagination import after_cursor, next_cursor
 
 
 @crud_class_decorator
@@ -34,6 +40,42 @@ class UserCrudManager:
 
         return users
 
+    async def get_page(
+        self,
+        role: str,
+        limit: int,
+        cursor: tuple,
+        db_session: AsyncSession,
+    ):
+        # Oldest first, continuing after the (created_at, id) cursor
+        stmt = select(
+            UserModel.id,
+            UserModel.username,
+            UserModel.name,
+            UserModel.created_at,
+        ).where(UserModel.role == role)
+        if cursor:
+            stmt = stmt.where(after_cursor(UserModel.created_at, UserModel.id, cursor))
+        stmt = stmt.order_by(UserModel.created_at, UserModel.id).limit(limit + 1)
+        result = await db_session.execute(stmt)
+
+        return next_cursor(result.all(), limit)
+
+    async def stream_all(
+        self,
+        db_session: AsyncSession,
+        chunk_size: int = 1000,
+    ):
+        stmt = select(
+            UserModel.username,
+            UserModel.name,
+            UserModel.role,
+            UserModel.created_at,
+        ).execution_options(yield_per=chunk_size)
+        result = await db_session.stream(stmt)
+        async for rows in result.partitions():
+            yield rows
+
     async def get(
         self,
         user_id: str,
@@ -56,13 +98,63 @@ class UserCrudManager:
 
         return user
 
+    async def get_by_usernames(
+        self,
+        usernames: list[str],
+        db_session: AsyncSession,
+        chunk_size: int = 1000,
+    ):
+        users = []
+        for chunk in chunked(set(usernames), chunk_size):
+            stmt = select(UserModel.id, UserModel.username).where(
+                UserModel.username.in_(chunk)
+            )
+            result = await db_session.execute(stmt)
+            users.extend(result.all())
+
+        return users
+
     async def delete_by_username(
         self,
         username: str,
         db_session: AsyncSession,
     ):
+        stmt = select(UserModel.id).where(UserModel.username == username)
+        result = await db_session.execute(stmt)
+        user_ids = result.scalars().all()
+
         stmt = delete(UserModel).where(UserModel.username == username)
         await db_session.execute(stmt)
         await db_session.commit()
+        forget_dashboards(user_ids)
+
+        return
+
+    async def delete_by_ids(
+        self,
+        user_ids: list[str],
+        db_session: AsyncSession,
+    ):
+        # Delete answers and records explicitly (no row-by-row cascade)
+        exam_record_ids = select(ExamRecordModel.id).where(
+            ExamRecordModel.user_id.in_(user_ids)
+        )
+        stmt = delete(ExamAnswerModel).where(
+            ExamAnswerModel.exam_record_id.in_(exam_record_ids)
+        )
+        await db_session.execute(stmt)
+
+        stmt = delete(ExamRecordModel).where(ExamRecordModel.user_id.in_(user_ids))
+        await db_session.execute(stmt)
+
+        stmt = delete(ExamSeenQuestionModel).where(
+            ExamSeenQuestionModel.user_id.in_(user_ids)
+        )
+        await db_session.execute(stmt)
+
+        stmt = delete(UserModel).where(UserModel.id.in_(user_ids))
+        await db_session.execute(stmt)
+        await db_session.commit()
+        forget_dashboards(user_ids)
 
         return
@@ -1,16 +1,22 @@
+from asyncio import Semaphore
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from inspect import isasyncgenfunction
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
+from database.schema_upgrade import upgrade_schema
 from models.base import Base
-from settings.configs import Settings
+from settings.configs import get_settings
 
-settings = Settings()
+settings = get_settings()
 
 
 engine = create_async_engine(
     f"mysql+aiomysql://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}",
     echo=True,
     pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
 )
 
 SessionLocal = async_sessionmaker(
@@ -20,16 +26,39 @@ SessionLocal = async_sessionmaker(
 )
 
 
+# 為測驗保留 exam_reserved 個連線：測驗請求 (及測驗相關的背景工作) 可使用整個連線池，
+# 其他工作 (教師、批次、匯入、未分類的路由) 最多同時使用其餘的連線
+exam_priority = ContextVar("exam_priority", default=False)
+_unreserved_connections = None
+
+
+@asynccontextmanager
+async def connection_slot():
+    global _unreserved_connections
+    if exam_priority.get():
+        yield
+        return
+
+    if _unreserved_connections is None:
+        _unreserved_connections = Semaphore(
+            settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW - settings.DB_EXAM_RESERVED
+        )
+    async with _unreserved_connections:
+        yield
+
+
 @asynccontextmanager
 async def get_db():
-    async with SessionLocal() as db:
-        async with db.begin():
-            yield db
+    async with connection_slot():
+        async with SessionLocal() as db:
+            async with db.begin():
+                yield db
 
 
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade_schema)
 
 
 async def close_db():
@@ -42,6 +71,17 @@ async def drop_all_tables():
 
 
 def db_session_decorator(func):
+    # Keep the session open until the generator is exhausted (streaming queries)
+    if isasyncgenfunction(func):
+
+        async def generator_wrapper(*args, **kwargs):
+            async with get_db() as db_session:
+                kwargs["db_session"] = db_session
+                async for item in func(*args, **kwargs):
+                    yield item
+
+        return generator_wrapper
+
     async def wrapper(*args, **kwargs):
         async with get_db() as db_session:
             kwargs["db_session"] = db_session
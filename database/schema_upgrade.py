@@ -0,0 +1,128 @@
+"""
+Base.metadata.create_all 只會建立不存在的資料表，不會修改既有的資料表。
+此處於啟動時補上既有資料表缺少的欄位 (一律先以可為 NULL 加入並建立索引)，
+再分批回填既有資料。所有步驟皆可重複執行。
+"""
+
+from logging import getLogger
+from pathlib import Path
+
+from sqlalchemy import bindparam, func, inspect, select, text, update
+
+from models.exam_record import ExamRecord
+from models.question import Question
+
+logger = getLogger(__name__)
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _columns(conn, table):
+    return {column["name"]: column for column in inspect(conn).get_columns(table.name)}
+
+
+def _column_ddl(conn, column, nullable: bool):
+    quote = conn.dialect.identifier_preparer.quote
+    column_type = column.type.compile(dialect=conn.dialect)
+    return f"{quote(column.name)} {column_type} {'NULL' if nullable else 'NOT NULL'}"
+
+
+def add_missing_column(conn, table, column_name: str):
+    """既有資料表缺少欄位時加入 (可為 NULL) 並建立含該欄位的索引，回傳是否有加入。"""
+    if column_name in _columns(conn, table):
+        return False
+
+    quote = conn.dialect.identifier_preparer.quote
+    column = table.c[column_name]
+    conn.execute(
+        text(
+            f"ALTER TABLE {quote(table.name)} "
+            f"ADD COLUMN {_column_ddl(conn, column, nullable=True)}"
+        )
+    )
+    for index in table.indexes:
+        if column_name in index.columns:
+            index.create(conn, checkfirst=True)
+
+    logger.warning("Added column %s.%s", table.name, column_name)
+    return True
+
+
+def widen_column(conn, table, column_name: str):
+    """既有欄位長度小於模型定義時加大 (保留原本是否可為 NULL)。"""
+    existing = _columns(conn, table).get(column_name)
+    column = table.c[column_name]
+    length = getattr(existing["type"], "length", None) if existing else None
+    if length is None or length >= column.type.length:
+        return
+
+    quote = conn.dialect.identifier_preparer.quote
+    conn.execute(
+        text(
+            f"ALTER TABLE {quote(table.name)} "
+            f"MODIFY COLUMN {_column_ddl(conn, column, existing['nullable'])}"
+        )
+    )
+    logger.warning(
+        "Widened column %s.%s to %d", table.name, column_name, column.type.length
+    )
+
+
+def serial_number_from_image_path(image_path: str, question_id: str):
+    # Legacy image files are named {serial_number}_{question id}.jpg
+    stem = Path(image_path).stem
+    suffix = f"_{question_id}"
+    return stem[: -len(suffix)] if stem.endswith(suffix) else stem
+
+
+def backfill_serial_numbers(conn):
+    table = Question.__table__
+    stmt = update(table).where(table.c.id == bindparam("question_id"))
+    stmt = stmt.values(serial_number=bindparam("new_serial_number"))
+
+    while True:
+        rows = conn.execute(
+            select(table.c.id, table.c.image_path)
+            .where(table.c.serial_number.is_(None))
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+
+        conn.execute(
+            stmt,
+            [
+                {
+                    "question_id": question_id,
+                    "new_serial_number": serial_number_from_image_path(
+                        image_path, question_id
+                    ),
+                }
+                for question_id, image_path in rows
+            ],
+        )
+
+
+def backfill_question_counts(conn):
+    table = ExamRecord.__table__
+    stmt = (
+        update(table)
+        .where(table.c.question_count.is_(None))
+        .values(question_count=func.json_length(table.c.user_answers))
+        .with_dialect_options(mysql_limit=BACKFILL_BATCH_SIZE)
+    )
+    while conn.execute(stmt).rowcount >= BACKFILL_BATCH_SIZE:
+        pass
+
+
+def upgrade_schema(conn):
+    question = Question.__table__
+    add_missing_column(conn, question, "serial_number")
+    widen_column(conn, question, "serial_number")
+    backfill_serial_numbers(conn)
+    # Filled in by utils.image_migrate (hashing the image files)
+    add_missing_column(conn, question, "image_hash")
+
+    exam_record = ExamRecord.__table__
+    add_missing_column(conn, exam_record, "question_count")
+    backfill_question_counts(conn)
@@ -1,3 +1,6 @@
+# Imported first so that the startup profile covers all other imports
+from utils.startup_profile import startup_profile
+
 from asyncio import run
 
 from api import api_run
@@ -6,10 +9,11 @@ from crud.user import UserCrudManager
 from database.mysql import init_db, close_db, drop_all_tables
 from models.base import Role
 from schemas import user as UserSchema
-from settings.configs import Settings
+from settings.configs import get_settings
 
-settings = Settings()
+settings = get_settings()
 UserCrud = UserCrudManager()
+startup_profile.mark("import")
 
 
 async def create_admin_user():
@@ -25,6 +29,7 @@ async def create_admin_user():
 
 async def main():
     await init_db()
+    startup_profile.mark("db_init")
     # await create_admin_user()
     await api_run()
     await drop_all_tables()
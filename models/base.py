@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import DateTime, Integer, String
+from sqlalchemy import Boolean, DateTime, Integer, String
 from sqlalchemy.dialects.mysql import JSON
 from sqlalchemy.orm import DeclarativeBase, mapped_column
 from typing import Annotated
@@ -24,6 +24,24 @@ class Exam_type(str, Enum):
     NATURE_SCIENCE_APTITUDE = "nature_science_aptitude"
 
 
+class Exam_mode(str, Enum):
+    RANDOM = "random"
+    ADAPTIVE = "adaptive"
+    NO_REPEAT = "no_repeat"
+
+
+class Import_kind(str, Enum):
+    QUESTION = "question"
+    USER = "user"
+
+
+class Import_status(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -32,10 +50,13 @@ class BaseType:
     uuid = Annotated[str, mapped_column(String(36), primary_key=True)]
     hashed_password = Annotated[str, mapped_column(String(60))]
     int_type = Annotated[int, mapped_column(Integer)]
+    bool_type = Annotated[bool, mapped_column(Boolean)]
     str_4 = Annotated[str, mapped_column(String(4))]
     str_10 = Annotated[str, mapped_column(String(10))]
     str_20 = Annotated[str, mapped_column(String(20))]
     str_30 = Annotated[str, mapped_column(String(30))]
+    str_64 = Annotated[str, mapped_column(String(64))]
+    str_255 = Annotated[str, mapped_column(String(255))]
     str_1000 = Annotated[str, mapped_column(String(1000))]
     datetime = Annotated[datetime, mapped_column(DateTime)]
     json_type = Annotated[dict, mapped_column(JSON)]
@@ -0,0 +1,32 @@
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.base import Base, BaseType
+
+
+class ExamAnswer(Base):
+    __tablename__ = "ExamAnswer"
+    exam_record_id: Mapped[BaseType.uuid] = mapped_column(
+        ForeignKey("ExamRecord.id", ondelete="CASCADE")
+    )
+    question_id: Mapped[BaseType.uuid] = mapped_column(index=True)
+    position: Mapped[BaseType.int_type]
+    user_answer: Mapped[BaseType.str_10]
+    is_correct: Mapped[BaseType.bool_type]
+
+    def __init__(
+        self,
+        exam_record_id: str,
+        question_id: str,
+        position: int,
+        user_answer: str,
+        is_correct: bool,
+    ):
+        self.exam_record_id = exam_record_id
+        self.question_id = question_id
+        self.position = position
+        self.user_answer = user_answer
+        self.is_correct = is_correct
+
+    def __repr__(self):
+        return f"ExamAnswer(exam_record_id={self.exam_record_id}, question_id={self.question_id}, position={self.position}, user_answer={self.user_answer}, is_correct={self.is_correct})"
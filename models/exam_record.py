@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from uuid import uuid4
 
@@ -9,12 +9,25 @@ from schemas.exam_record import UserAnswer
 
 class ExamRecord(Base):
     __tablename__ = "ExamRecord"
+    __table_args__ = (
+        # Covering index for paginated exam history and per-type summaries
+        Index(
+            "ix_ExamRecord_user_history",
+            "user_id",
+            "exam_type",
+            "created_at",
+            "id",
+            "score",
+            "question_count",
+        ),
+    )
     id: Mapped[BaseType.uuid]
     user_id: Mapped[BaseType.uuid] = mapped_column(
         ForeignKey("User.id", ondelete="CASCADE")
     )
     exam_type: Mapped[BaseType.str_30]
     score: Mapped[BaseType.int_type]
+    question_count: Mapped[BaseType.int_type]
     user_answers: Mapped[BaseType.json_type]
     created_at: Mapped[BaseType.datetime]
 
@@ -22,7 +35,7 @@ class ExamRecord(Base):
     user_info: Mapped["User"] = relationship(
         "User",
         back_populates="exam_records",
-        lazy="joined",
+        lazy="raise",
     )
 
     def __init__(
@@ -40,7 +53,8 @@ class ExamRecord(Base):
         self.user_answers = (
             [item.model_dump() for item in user_answers] if user_answers else []
         )
+        self.question_count = len(self.user_answers)
         self.created_at = datetime.now()
 
     def __repr__(self):
-        return f"ExamRecord(id={self.id}, user_id={self.user_id}, exam_type={self.exam_type}, score={self.score}, user_answers={self.user_answers}, created_at={self.created_at})"
+        return f"ExamRecord(id={self.id}, user_id={self.user_id}, exam_type={self.exam_type}, score={self.score}, question_count={self.question_count}, user_answers={self.user_answers}, created_at={self.created_at})"
@@ -0,0 +1,21 @@
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.base import Base, BaseType
+
+
+class ExamSeenQuestion(Base):
+    __tablename__ = "ExamSeenQuestion"
+    user_id: Mapped[BaseType.uuid] = mapped_column(
+        ForeignKey("User.id", ondelete="CASCADE")
+    )
+    exam_type: Mapped[BaseType.str_30] = mapped_column(primary_key=True)
+    question_id: Mapped[BaseType.uuid]
+
+    def __init__(self, user_id: str, exam_type: str, question_id: str):
+        self.user_id = user_id
+        self.exam_type = exam_type
+        self.question_id = question_id
+
+    def __repr__(self):
+        return f"ExamSeenQuestion(user_id={self.user_id}, exam_type={self.exam_type}, question_id={self.question_id})"
@@ -0,0 +1,73 @@
+from datetime import datetime
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from uuid import uuid4
+
+from models.base import Base, BaseType, Import_status
+
+
+class ImportJob(Base):
+    __tablename__ = "ImportJob"
+    __table_args__ = (
+        # Unfinished jobs are resumed at startup
+        Index("ix_ImportJob_status", "status", "created_at"),
+    )
+    id: Mapped[BaseType.uuid]
+    created_by: Mapped[BaseType.uuid] = mapped_column(
+        ForeignKey("User.id", ondelete="CASCADE")
+    )
+    kind: Mapped[BaseType.str_10]
+    status: Mapped[BaseType.str_10]
+    filename: Mapped[BaseType.str_1000]
+    upload_path: Mapped[BaseType.str_1000]
+    total: Mapped[BaseType.int_type]
+    processed: Mapped[BaseType.int_type]
+    succeeded: Mapped[BaseType.int_type]
+    failed: Mapped[BaseType.int_type]
+    error: Mapped[BaseType.str_1000]
+    created_at: Mapped[BaseType.datetime]
+    updated_at: Mapped[BaseType.datetime]
+
+    def __init__(
+        self,
+        created_by: str,
+        kind: str,
+        filename: str,
+        upload_path: str,
+        id: str = None,
+    ):
+        self.id = id or str(uuid4())
+        self.created_by = created_by
+        self.kind = kind
+        self.status = Import_status.PENDING
+        self.filename = filename
+        self.upload_path = upload_path
+        self.total = 0
+        self.processed = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.error = ""
+        self.created_at = datetime.now()
+        self.updated_at = self.created_at
+
+    def __repr__(self):
+        return f"ImportJob(id={self.id}, created_by={self.created_by}, kind={self.kind}, status={self.status}, filename={self.filename}, upload_path={self.upload_path}, total={self.total}, processed={self.processed}, succeeded={self.succeeded}, failed={self.failed}, error={self.error}, created_at={self.created_at}, updated_at={self.updated_at})"
+
+
+class ImportJobFailure(Base):
+    __tablename__ = "ImportJobFailure"
+    job_id: Mapped[BaseType.uuid] = mapped_column(
+        ForeignKey("ImportJob.id", ondelete="CASCADE")
+    )
+    row_number: Mapped[BaseType.int_type] = mapped_column(primary_key=True)
+    item: Mapped[BaseType.str_1000]
+    reason: Mapped[BaseType.str_1000]
+
+    def __init__(self, job_id: str, row_number: int, item: str, reason: str):
+        self.job_id = job_id
+        self.row_number = row_number
+        self.item = item
+        self.reason = reason
+
+    def __repr__(self):
+        return f"ImportJobFailure(job_id={self.job_id}, row_number={self.row_number}, item={self.item}, reason={self.reason})"
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import Mapped, mapped_column
 from uuid import uuid4
 
 from models.base import Base, BaseType
@@ -9,22 +9,29 @@ class Question(Base):
     __tablename__ = "Question"
     id: Mapped[BaseType.uuid]
     subject: Mapped[BaseType.str_20]
+    serial_number: Mapped[BaseType.str_255] = mapped_column(index=True)
     image_path: Mapped[BaseType.str_1000]
+    # NULL for legacy images until moved into the image store (utils.image_migrate)
+    image_hash: Mapped[BaseType.str_64] = mapped_column(index=True, nullable=True)
     answer: Mapped[BaseType.str_4]
     created_at: Mapped[BaseType.datetime]
 
     def __init__(
         self,
         subject: str,
+        serial_number: str,
         image_path: str,
+        image_hash: str,
         answer: str,
         id: str = None,
     ):
         self.id = id or str(uuid4())
         self.subject = subject
+        self.serial_number = serial_number
         self.image_path = image_path
+        self.image_hash = image_hash
         self.answer = answer
         self.created_at = datetime.now()
 
     def __repr__(self):
-        return f"Question(id={self.id}, subject={self.subject}, image_path={self.image_path}, answer={self.answer}, created_at={self.created_at})"
+        return f"Question(id={self.id}, subject={self.subject}, serial_number={self.serial_number}, image_path={self.image_path}, image_hash={self.image_hash}, answer={self.answer}, created_at={self.created_at})"
@@ -1,4 +1,5 @@
 from datetime import datetime
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, relationship
 from uuid import uuid4
 
@@ -7,6 +8,17 @@ from models.base import Base, BaseType
 
 class User(Base):
     __tablename__ = "User"
+    __table_args__ = (
+        # Covering index for paginated user listing
+        Index(
+            "ix_User_role_listing",
+            "role",
+            "created_at",
+            "id",
+            "username",
+            "name",
+        ),
+    )
     id: Mapped[BaseType.uuid]
     username: Mapped[BaseType.str_10]
     password: Mapped[BaseType.hashed_password]
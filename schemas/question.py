@@ -4,5 +4,7 @@ from pydantic import BaseModel, Field
 class QuestionCreate(BaseModel):
     id: str = Field(min_length=1, max_length=36)
     subject: str = Field(min_length=1, max_length=20)
+    serial_number: str = Field(min_length=1, max_length=255)
     image_path: str = Field(min_length=1, max_length=1000)
+    image_hash: str = Field(min_length=64, max_length=64)
     answer: str = Field(min_length=1, max_length=4)
@@ -1,10 +1,35 @@
 import json
+from functools import lru_cache
+from os import environ
+
+CONFIG_PATH_ENV = "QB_CONFIG"
+CONFIG_OVERRIDE_PREFIX = "QB_"
+
+
+def apply_env_overrides(configs: dict, variables: dict):
+    """
+    以環境變數覆寫設定，格式為 QB_<SECTION>__<KEY>，例如 QB_MYSQL__HOST=db。
+    值可解析為 JSON 時 (數字、布林、陣列) 以 JSON 解析，否則視為字串。
+    """
+    for name, value in variables.items():
+        if not name.startswith(CONFIG_OVERRIDE_PREFIX) or "__" not in name:
+            continue
+
+        section, key = name[len(CONFIG_OVERRIDE_PREFIX) :].lower().split("__", 1)
+        if section not in configs or key not in configs[section]:
+            continue
+
+        try:
+            configs[section][key] = json.loads(value)
+        except ValueError:
+            configs[section][key] = value
 
 
 class Settings:
     def __init__(self):
-        with open("settings/configs.json") as file:
+        with open(environ.get(CONFIG_PATH_ENV, "settings/configs.json")) as file:
             self.configs = json.load(file)
+        apply_env_overrides(self.configs, environ)
 
         # App settings
         self.APP_NAME = self.configs["app"]["name"]
@@ -21,6 +46,9 @@ class Settings:
         self.DB_USER = self.configs["mysql"]["user"]
         self.DB_PASSWORD = self.configs["mysql"]["password"]
         self.DB_NAME = self.configs["mysql"]["db_name"]
+        self.DB_POOL_SIZE = self.configs["mysql"]["pool_size"]
+        self.DB_MAX_OVERFLOW = self.configs["mysql"]["max_overflow"]
+        self.DB_EXAM_RESERVED = self.configs["mysql"]["exam_reserved"]
 
         # Secret keys settings
         self.SESSION_SECRET_KEY = self.configs["secret_keys"]["session"]
@@ -30,3 +58,102 @@ class Settings:
         self.PROTECTED_IMG_DIR = self.configs["paths"]["protected_img_dir"]
         self.MATH_DIRNAME = self.configs["paths"]["math_dirname"]
         self.NATURE_SCIENCE_DIRNAME = self.configs["paths"]["nature_science_dirname"]
+
+        # Content-addressed question image store settings
+        self.IMAGE_STORE_DIRNAME = self.configs["image_store"]["dirname"]
+        self.IMAGE_STORE_FANOUT_LEVELS = self.configs["image_store"]["fanout_levels"]
+        self.IMAGE_STORE_FANOUT_WIDTH = self.configs["image_store"]["fanout_width"]
+        self.IMAGE_REMOVE_GRACE_PERIOD = self.configs["image_store"][
+            "remove_grace_period"
+        ]
+        self.IMAGE_CACHE_MAX_AGE = self.configs["image_store"]["cache_max_age"]
+
+        # Exam paper pool settings
+        self.EXAM_POOL_SIZE = self.configs["exam_pool"]["size"]
+        self.EXAM_POOL_LOW_WATER_MARK = self.configs["exam_pool"]["low_water_mark"]
+
+        # Question bank settings (stamp file touched by offline tools)
+        self.QUESTION_BANK_STAMP_FILE = self.configs["question_bank"]["stamp_file"]
+        self.QUESTION_BANK_STAMP_CHECK_INTERVAL = self.configs["question_bank"][
+            "stamp_check_interval"
+        ]
+
+        # Exam session settings
+        self.EXAM_SESSION_MAX_SIZE = self.configs["exam_session"]["max_size"]
+        self.EXAM_SESSION_GRACE_PERIOD = self.configs["exam_session"]["grace_period"]
+
+        # Bulk delete settings
+        self.BULK_DELETE_BATCH_SIZE = self.configs["bulk_delete"]["batch_size"]
+
+        # Cache settings
+        self.EXAM_RESULT_CACHE_MAX_SIZE = self.configs["cache"]["exam_result_max_size"]
+        self.DASHBOARD_CACHE_MAX_SIZE = self.configs["cache"]["dashboard_max_size"]
+
+        # Adaptive question selection settings
+        self.ADAPTIVE_MAX_STUDENTS = self.configs["adaptive"]["max_students"]
+        self.ADAPTIVE_UNSEEN_WEIGHT = self.configs["adaptive"]["unseen_weight"]
+        self.ADAPTIVE_MISSED_WEIGHT = self.configs["adaptive"]["missed_weight"]
+        self.ADAPTIVE_CORRECT_WEIGHT_SCHEDULE = self.configs["adaptive"][
+            "correct_weight_schedule"
+        ]
+
+        # No-repeat question selection settings
+        self.NO_REPEAT_MAX_STUDENTS = self.configs["no_repeat"]["max_students"]
+
+        # Template settings
+        self.TEMPLATES_DIR = self.configs["templates"]["directory"]
+        self.TEMPLATES_BYTECODE_CACHE_DIR = self.configs["templates"][
+            "bytecode_cache_dir"
+        ]
+        self.TEMPLATES_AUTO_RELOAD = self.configs["templates"]["auto_reload"]
+
+        # Static files and compression settings
+        self.STATIC_DIR = self.configs["static"]["directory"]
+        self.STATIC_DIST_DIRNAME = self.configs["static"]["dist_dirname"]
+        self.COMPRESSION_MIN_SIZE = self.configs["compression"]["min_size"]
+
+        # Login throttle settings
+        self.THROTTLE_BACKEND = self.configs["login_throttle"]["backend"]
+        self.THROTTLE_REDIS_URL = self.configs["login_throttle"]["redis_url"]
+        self.THROTTLE_MAX_KEYS = self.configs["login_throttle"]["max_keys"]
+        self.THROTTLE_ACCOUNT_LIMIT = self.configs["login_throttle"]["account"]
+        self.THROTTLE_IP_LIMIT = self.configs["login_throttle"]["ip"]
+
+        # Exam submission queue settings
+        self.SUBMISSION_QUEUE_ENABLED = self.configs["submission_queue"]["enabled"]
+        self.SUBMISSION_QUEUE_DIR = self.configs["submission_queue"]["directory"]
+        self.SUBMISSION_QUEUE_BATCH_SIZE = self.configs["submission_queue"]["batch_size"]
+        self.SUBMISSION_QUEUE_FLUSH_INTERVAL = self.configs["submission_queue"][
+            "flush_interval"
+        ]
+
+        # Pagination settings
+        self.EXAM_HISTORY_PAGE_SIZE = self.configs["pagination"]["exam_history_page_size"]
+        self.USER_LIST_PAGE_SIZE = self.configs["pagination"]["user_list_page_size"]
+
+        # Admission control settings (exam / interactive / bulk lanes)
+        self.ADMISSION_LANES = self.configs["admission"]
+
+        # Bulk import job settings
+        self.IMPORT_JOBS_DIR = self.configs["import_jobs"]["directory"]
+        self.IMPORT_JOBS_CONCURRENCY = self.configs["import_jobs"]["concurrency"]
+        self.IMPORT_JOBS_PROGRESS_INTERVAL = self.configs["import_jobs"][
+            "progress_interval"
+        ]
+
+        # Metrics settings
+        self.METRICS_ALLOWED_HOSTS = self.configs["metrics"]["allowed_hosts"]
+        self.METRICS_LATENCY_BUCKETS = self.configs["metrics"]["latency_buckets"]
+        self.METRICS_LOOP_LAG_INTERVAL = self.configs["metrics"]["loop_lag_interval"]
+        self.METRICS_LOOP_LAG_BUCKETS = self.configs["metrics"]["loop_lag_buckets"]
+
+        # Sampling profiler settings
+        self.PROFILER_INTERVAL = self.configs["profiler"]["interval"]
+        self.PROFILER_MAX_DURATION = self.configs["profiler"]["max_duration"]
+        self.PROFILER_MEMORY_FRAMES = self.configs["profiler"]["memory_frames"]
+
+
+# 整個行程共用同一份設定 (只讀取一次設定檔)
+@lru_cache(maxsize=None)
+def get_settings():
+    return Settings()
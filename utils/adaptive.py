@@ -0,0 +1,219 @@
+from bisect import bisect_right
+from heapq import heappop, heappush
+from random import random
+from time import time
+
+from crud.exam_record import ExamRecordCrudManager
+from settings.configs import get_settings
+from utils.cache import LRUCache
+from utils.question_bank import question_bank
+
+settings = get_settings()
+ExamRecordCrud = ExamRecordCrudManager()
+
+
+class FenwickTree:
+    """
+    以 Fenwick tree (binary indexed tree) 維護權重前綴和，
+    單一權重更新與依權重抽出一題皆為 O(log n)。
+    """
+
+    def __init__(self, weights):
+        self.weights = list(weights)
+        self.tree = [0.0] + self.weights
+        n = len(self.weights)
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                self.tree[parent] += self.tree[i]
+        self.top = 1 << (n.bit_length() - 1) if n else 0
+
+    def __len__(self):
+        return len(self.weights)
+
+    def update(self, index: int, weight: float):
+        delta = weight - self.weights[index]
+        self.weights[index] = weight
+        i = index + 1
+        while i <= len(self.weights):
+            self.tree[i] += delta
+            i += i & -i
+
+    def total(self):
+        total = 0.0
+        i = len(self.weights)
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def find(self, target: float):
+        # Smallest index whose prefix sum exceeds target
+        pos = 0
+        step = self.top
+        while step:
+            nxt = pos + step
+            if nxt <= len(self.weights) and self.tree[nxt] <= target:
+                pos = nxt
+                target -= self.tree[nxt]
+            step >>= 1
+        return pos
+
+    def sample(self, k: int):
+        """依權重不重複抽出 k 個索引，抽中的權重暫時歸零，抽完後還原。"""
+        picked = {}
+        attempts = 0
+        while len(picked) < k and attempts < 4 * k:
+            attempts += 1
+            total = self.total()
+            if total <= 0:
+                break
+
+            i = self.find(random() * total)
+            # Floating point drift may land past the last positive weight
+            if i >= len(self.weights) or self.weights[i] <= 0:
+                continue
+
+            picked[i] = self.weights[i]
+            self.update(i, 0.0)
+
+        for i, weight in picked.items():
+            self.update(i, weight)
+
+        return list(picked)
+
+
+class AdaptiveWeights:
+    """
+    依學生作答紀錄決定題目權重：未作答過、答錯過的題目權重較高，
+    答對的題目權重較低，並隨上次作答後經過的時間逐步回升。
+    """
+
+    def __init__(self, unseen_weight: float, missed_weight: float, correct_schedule):
+        self.unseen_weight = unseen_weight
+        self.missed_weight = missed_weight
+        self.ages = [age for age, _ in correct_schedule]
+        self.correct_weights = [weight for _, weight in correct_schedule]
+
+    def weight(self, last_seen, now: float):
+        if last_seen is None:
+            return self.unseen_weight
+
+        seen_at, is_correct = last_seen
+        if not is_correct:
+            return self.missed_weight
+
+        step = max(bisect_right(self.ages, now - seen_at) - 1, 0)
+        return self.correct_weights[step]
+
+    def next_change(self, last_seen, now: float):
+        # Time at which the weight of a correctly answered question rises next
+        seen_at, is_correct = last_seen
+        if not is_correct:
+            return None
+
+        step = bisect_right(self.ages, now - seen_at)
+        if step >= len(self.ages):
+            return None
+        return seen_at + self.ages[step]
+
+
+class StudentWeightTable:
+    """
+    單一學生在單一科目的權重表，以題庫的連續索引 (dense index) 對應。
+    last_seen 記錄每題最後一次作答的時間與是否答對，
+    refresh 為依時間排序的權重回升排程。
+    """
+
+    def __init__(self, last_seen: dict):
+        self.last_seen = last_seen
+        self.refresh = []
+        self.tree = FenwickTree([])
+        self.bank_version = None
+
+
+class AdaptiveSelector:
+    def __init__(self, max_students: int, weights: AdaptiveWeights):
+        self.weights = weights
+        self.tables = LRUCache("adaptive_weights", max_students)
+
+    def _rebuild(self, table, bank, now: float):
+        active = bank.active_set
+        table.tree = FenwickTree(
+            self.weights.weight(table.last_seen.get(i), now) if i in active else 0.0
+            for i in range(len(bank))
+        )
+        table.refresh = []
+        for i, last_seen in table.last_seen.items():
+            if i in active:
+                self._schedule(table, i, last_seen, now)
+        table.bank_version = bank.version
+
+    def _schedule(self, table, index: int, last_seen, now: float):
+        change_at = self.weights.next_change(last_seen, now)
+        if change_at is not None:
+            heappush(table.refresh, (change_at, index, last_seen[0]))
+
+    def _refresh(self, table, now: float):
+        while table.refresh and table.refresh[0][0] <= now:
+            _, i, seen_at = heappop(table.refresh)
+            last_seen = table.last_seen.get(i)
+            # Skip entries superseded by a newer answer
+            if not last_seen or last_seen[0] != seen_at:
+                continue
+            table.tree.update(i, self.weights.weight(last_seen, now))
+            self._schedule(table, i, last_seen, now)
+
+    async def _load(self, user_id: str, subject: str, bank):
+        last_seen = {}
+        async for rows in ExamRecordCrud.stream_answer_history(user_id, subject):
+            for question_id, is_correct, created_at in rows:
+                i = bank.index.get(question_id)
+                if i is not None:
+                    last_seen[i] = (created_at.timestamp(), bool(is_correct))
+        return StudentWeightTable(last_seen)
+
+    async def choose(self, user_id: str, subject: str, count: int):
+        bank = await question_bank.get(subject)
+        key = (user_id, subject)
+        table = self.tables.get(key)
+        if table is None:
+            table = await self._load(user_id, subject, bank)
+            self.tables.set(key, table)
+
+        now = time()
+        if table.bank_version != bank.version:
+            self._rebuild(table, bank, now)
+        else:
+            self._refresh(table, now)
+
+        return bank.paper(table.tree.sample(min(count, len(bank.active))))
+
+    def record_answers(self, user_id: str, subject: str, question_ids, correctness):
+        """作答送出後更新已載入的權重表 (未載入者下次出題時再從資料庫讀取)。"""
+        table = self.tables.items.get((user_id, subject))
+        if table is None:
+            return
+
+        bank = question_bank.banks[subject]
+        now = time()
+        for question_id, is_correct in zip(question_ids, correctness):
+            i = bank.index.get(question_id)
+            if i is None:
+                continue
+
+            last_seen = (now, is_correct)
+            table.last_seen[i] = last_seen
+            if table.bank_version == bank.version and i in bank.active_set:
+                table.tree.update(i, self.weights.weight(last_seen, now))
+                self._schedule(table, i, last_seen, now)
+
+
+adaptive_selector = AdaptiveSelector(
+    max_students=settings.ADAPTIVE_MAX_STUDENTS,
+    weights=AdaptiveWeights(
+        unseen_weight=settings.ADAPTIVE_UNSEEN_WEIGHT,
+        missed_weight=settings.ADAPTIVE_MISSED_WEIGHT,
+        correct_schedule=settings.ADAPTIVE_CORRECT_WEIGHT_SCHEDULE,
+    ),
+)
@@ -0,0 +1,10 @@
+from itertools import islice
+
+
+def chunked(items, size: int):
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,46 @@
+from collections import OrderedDict
+
+# 所有快取 (供統計命中率使用)
+caches = []
+
+
+class LRUCache:
+    """
+    限制數量的 LRU 快取，超過 max_size 時淘汰最久未使用的項目並呼叫 on_evict。
+    """
+
+    def __init__(self, name: str, max_size: int, on_evict=None):
+        self.name = name
+        self.max_size = max_size
+        self.on_evict = on_evict
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        caches.append(self)
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, key, default=None):
+        if key not in self.items:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self.items.move_to_end(key)
+        return self.items[key]
+
+    def set(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+
+        while len(self.items) > self.max_size:
+            evicted_key, evicted_value = self.items.popitem(last=False)
+            if self.on_evict:
+                self.on_evict(evicted_key, evicted_value)
+
+    def pop(self, key, default=None):
+        return self.items.pop(key, default)
+
+    def clear(self):
+        self.items.clear()
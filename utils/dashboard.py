@@ -0,0 +1,24 @@
+from settings.configs import get_settings
+from utils.cache import LRUCache
+
+settings = get_settings()
+
+# 儀表板測驗紀錄區塊的 HTML 快取，key 為 (user_id, 版本)；
+# 學生新增測驗紀錄或被刪除時版本遞增，舊版本的快取同時移除
+dashboard_versions = {}
+dashboard_cache = LRUCache("dashboard", settings.DASHBOARD_CACHE_MAX_SIZE)
+
+
+def dashboard_key(user_id):
+    return (user_id, dashboard_versions.get(user_id, 0))
+
+
+def bump_dashboard_version(user_id):
+    dashboard_cache.pop(dashboard_key(user_id))
+    dashboard_versions[user_id] = dashboard_versions.get(user_id, 0) + 1
+
+
+def forget_dashboards(user_ids):
+    for user_id in user_ids:
+        dashboard_cache.pop(dashboard_key(user_id))
+        dashboard_versions.pop(user_id, None)
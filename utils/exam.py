@@ -1,70 +1,292 @@
-from random import sample
+from collections import defaultdict
+from markupsafe import Markup
 
-from auth.image import generate_image_token
+from auth.image import question_image_token
 from crud.exam_record import ExamRecordCrudManager
-from crud.question import QuestionCrudManager
+from models.base import Exam_mode
+from settings.configs import get_settings
 from settings.subject import SUBJECT_EXAM_INFO
+from utils.adaptive import adaptive_selector
+from utils.cache import LRUCache
+from utils.dashboard import dashboard_cache, dashboard_key
+from utils.exam_pool import exam_paper_pool
+from utils.no_repeat import no_repeat_selector
+from utils.pagination import decode_cursor
+from utils.question_bank import question_bank
+from utils.submission_queue import submission_queue
 
+settings = get_settings()
 ExamRecordCrud = ExamRecordCrudManager()
-QuestionCrud = QuestionCrudManager()
 
+# 測驗結果快取 (exam_record_id -> 結果資料)，以及各題目出現在哪些快取紀錄中
+exam_records_by_question = defaultdict(set)
 
-async def exam_dashboard_data(ids):
-    records = []
-    all_correct = 0
-    all_questions = 0
 
-    for exam_id in ids:
-        exam = await ExamRecordCrud.get(exam_id)
-        records.append(
+def _forget_exam_result(exam_record_id, exam_result):
+    for item in exam_result["user_answers"]:
+        records = exam_records_by_question.get(item["question_id"])
+        if records:
+            records.discard(exam_record_id)
+            if not records:
+                del exam_records_by_question[item["question_id"]]
+
+
+exam_result_cache = LRUCache(
+    "exam_result",
+    settings.EXAM_RESULT_CACHE_MAX_SIZE,
+    on_evict=_forget_exam_result,
+)
+
+
+def exam_history_data(rows):
+    return [
+        {
+            "exam_record_id": row.id,
+            "score": row.score,
+            "question_count": row.question_count,
+            "accuracy": format_accuracy(row.score, row.question_count),
+            "created_at": row.created_at,
+        }
+        for row in rows
+    ]
+
+
+async def get_exam_history_page(user_id, exam_type, cursor=None):
+    rows, next_page = await ExamRecordCrud.get_page_by_user_id(
+        user_id,
+        exam_type,
+        settings.EXAM_HISTORY_PAGE_SIZE,
+        decode_cursor(cursor),
+    )
+    return exam_history_data(rows), next_page
+
+
+async def get_exam_render_info(user_id):
+    # 各測驗類型的總答題狀況及最近一頁的測驗紀錄
+    summaries = {
+        summary.exam_type: summary
+        for summary in await ExamRecordCrud.get_summary_by_user_id(user_id)
+    }
+
+    exam_lists = {}
+    for exam_type in SUBJECT_EXAM_INFO:
+        summary = summaries.get(exam_type)
+        all_correct = int(summary.all_correct) if summary else 0
+        all_questions = int(summary.all_questions) if summary else 0
+        records, next_page = await get_exam_history_page(user_id, exam_type)
+
+        exam_lists[exam_type] = {
+            "all_correct": all_correct,
+            "all_questions": all_questions,
+            "all_accuracy": format_accuracy(all_correct, all_questions),
+            "exam_records": records,
+            "next_cursor": next_page,
+        }
+
+    return exam_lists
+
+
+async def get_exam_records_html(user_id, template):
+    # 儀表板的測驗紀錄區塊，依使用者及其紀錄版本快取
+    key = dashboard_key(user_id)
+    exam_records_html = dashboard_cache.get(key)
+    if exam_records_html is None:
+        exam_lists = await get_exam_render_info(user_id)
+        exam_records_html = Markup(
+            template.render(exam_lists=exam_lists, user_id=user_id)
+        )
+
+        # Skip caching if a new exam record was added while rendering
+        if dashboard_key(user_id) == key:
+            dashboard_cache.set(key, exam_records_html)
+
+    return exam_records_html
+
+
+def _exam_result(user_id, exam_type, score, user_answers, answer_keys):
+    return {
+        "user_id": user_id,
+        "exam_type": exam_type,
+        "score": score,
+        "accuracy": format_accuracy(score, len(user_answers)),
+        "user_answers": [
             {
-                "exam_record_id": exam_id,
-                "score": exam.score,
-                "question_count": len(exam.user_answers),
-                "accuracy": (
-                    f"{(exam.score / len(exam.user_answers)) * 100:.2f}%"
-                    if len(exam.user_answers)
-                    else "0.00%"
-                ),
-                "created_at": exam.created_at,
+                "question_id": item["question_id"],
+                "answer": answer_keys[item["question_id"]],
+                "user_answer": item["user_answer"],
+                "is_correct": answer_keys[item["question_id"]] == item["user_answer"],
             }
+            for item in user_answers
+            if item["question_id"] in answer_keys
+        ],
+    }
+
+
+async def get_exam_result_data(exam_record_id):
+    exam_result = exam_result_cache.get(exam_record_id)
+    if exam_result:
+        return exam_result
+
+    # Submission not written to the database yet
+    queued_record = submission_queue.pending.get(exam_record_id)
+    if queued_record:
+        return _exam_result(
+            queued_record["user_id"],
+            queued_record["exam_type"],
+            queued_record["score"],
+            queued_record["user_answers"],
+            queued_record["answer_keys"],
         )
-        all_correct += exam.score
-        all_questions += len(exam.user_answers)
 
-    records.sort(key=lambda x: x["created_at"], reverse=True)
-    all_accuracy = (
-        f"{(all_correct / all_questions) * 100:.2f}%" if all_questions else "0.00%"
+    exam_record, answer_keys = await ExamRecordCrud.get_with_answer_keys(exam_record_id)
+    if not exam_record:
+        return None
+
+    exam_result = _exam_result(
+        exam_record.user_id,
+        exam_record.exam_type,
+        exam_record.score,
+        exam_record.user_answers,
+        answer_keys,
     )
 
-    return {
-        "all_correct": all_correct,
-        "all_questions": all_questions,
-        "all_accuracy": all_accuracy,
-        "exam_records": records,
-    }
+    exam_result_cache.set(exam_record_id, exam_result)
+    for item in exam_result["user_answers"]:
+        exam_records_by_question[item["question_id"]].add(exam_record_id)
 
+    return exam_result
 
-async def get_exam_render_info(user_id):
-    exam_records = await ExamRecordCrud.get_by_user_id(user_id)
-    exam_lists = {
-        exam_type: await exam_dashboard_data(
-            [item.id for item in exam_records if item.exam_type == exam_type]
+
+async def get_exam_result_answers_data(exam_result, current_user_id):
+    # Generate image token for each question (image hashes from the question bank)
+    subject = SUBJECT_EXAM_INFO[exam_result["exam_type"]]["subject"]
+    bank = await question_bank.get(subject)
+    user_answers = []
+    for item in exam_result["user_answers"]:
+        image_hash = bank.image_hash(item["question_id"])
+        user_answers.append(
+            {
+                **item,
+                "image_hash": image_hash,
+                "token": question_image_token(
+                    str(current_user_id), item["question_id"], image_hash
+                ),
+            }
         )
-        for exam_type in SUBJECT_EXAM_INFO
-    }
-    return exam_lists
+
+    return user_answers
+
+
+# 題目答案修正或刪除後，移除含有該題目的測驗結果快取
+def invalidate_exam_results(question_ids):
+    for question_id in question_ids:
+        for exam_record_id in exam_records_by_question.pop(question_id, ()):
+            exam_result = exam_result_cache.pop(exam_record_id)
+            if exam_result:
+                _forget_exam_result(exam_record_id, exam_result)
+
+
+def forget_user_exam_results(user_ids):
+    # Cached results of deleted users (not indexed by user, scan the cache)
+    user_ids = set(user_ids)
+    for exam_record_id, exam_result in list(exam_result_cache.items.items()):
+        if exam_result["user_id"] in user_ids:
+            exam_result_cache.pop(exam_record_id)
+            _forget_exam_result(exam_record_id, exam_result)
+
+
+def format_accuracy(correct, questions):
+    return f"{(correct / questions) * 100:.2f}%" if questions else "0.00%"
+
+
+GRADEBOOK_HEADER = ["username", "name"] + [
+    f"{exam_type}_{column}"
+    for exam_type in SUBJECT_EXAM_INFO
+    for column in ["attempts", "best_score", "latest_score", "accuracy"]
+]
 
 
-async def random_choose_questions(exam_type, current_user_id):
-    subject = SUBJECT_EXAM_INFO[exam_type]["subject"]
-    questions = await QuestionCrud.get_by_subject(subject)
+def _new_gradebook_row(result):
+    row = [result.username, result.name]
+    for _ in SUBJECT_EXAM_INFO:
+        row.extend([0, "", "", format_accuracy(0, 0)])
+    return row
+
+
+async def stream_gradebook_rows():
+    """
+    依學生彙整各測驗類型的作答次數、最高分、最近一次分數與總答對率，
+    每批資料庫結果輸出一批 CSV 資料列。
+    """
+    columns = {exam_type: i for i, exam_type in enumerate(SUBJECT_EXAM_INFO)}
+    current_user_id = None
+    current_row = None
+
+    async for results in ExamRecordCrud.stream_gradebook():
+        rows = []
+        for result in results:
+            if result.user_id != current_user_id:
+                if current_row:
+                    rows.append(current_row)
+                current_user_id = result.user_id
+                current_row = _new_gradebook_row(result)
+
+            if result.exam_type not in columns:
+                continue
+
+            offset = 2 + columns[result.exam_type] * 4
+            current_row[offset : offset + 4] = [
+                result.attempts,
+                result.best_score,
+                result.latest_score,
+                format_accuracy(result.all_correct, result.all_questions),
+            ]
+
+        if rows:
+            yield rows
+
+    if current_row:
+        yield [current_row]
+
+
+async def random_choose_questions(exam_type, current_user_id, mode=Exam_mode.RANDOM):
+    if mode == Exam_mode.ADAPTIVE:
+        info = SUBJECT_EXAM_INFO[exam_type]
+        return await adaptive_selector.choose(
+            current_user_id, info["subject"], info["question_count"]
+        )
+
+    if mode == Exam_mode.NO_REPEAT:
+        return await no_repeat_selector.choose(current_user_id, exam_type)
+
+    paper = await exam_paper_pool.pop(exam_type)
+    return paper
+
+
+def record_exam_answers(exam_type, current_user_id, user_answers, answer_keys):
+    # 更新學生的出題權重 (答錯的題目之後較常出現)
+    adaptive_selector.record_answers(
+        current_user_id,
+        SUBJECT_EXAM_INFO[exam_type]["subject"],
+        [item["question_id"] for item in user_answers],
+        [
+            answer_keys.get(item["question_id"]) == item["user_answer"]
+            for item in user_answers
+        ],
+    )
 
-    question_num = SUBJECT_EXAM_INFO[exam_type]["question_count"]
-    selected_quesions = sample(questions, min(question_num, len(questions)))
 
+def get_exam_questions_data(paper, current_user_id):
     # Generate image token for each question
-    for question in selected_quesions:
-        question.token = generate_image_token(str(current_user_id), question.id)
+    questions = [
+        {
+            "id": question.id,
+            "image_hash": question.image_hash,
+            "token": question_image_token(
+                str(current_user_id), question.id, question.image_hash
+            ),
+        }
+        for question in paper
+    ]
 
-    return selected_quesions
+    return questions
@@ -0,0 +1,49 @@
+"""
+將既有測驗紀錄的 user_answers (JSON) 展開寫入 ExamAnswer 資料表。
+可重複執行，只處理尚未寫入 ExamAnswer 的紀錄。
+
+執行方式 (於專案根目錄)：
+    python -m utils.exam_answer_backfill [--batch-size 500]
+"""
+
+from argparse import ArgumentParser
+from asyncio import run
+
+from crud.exam_record import ExamRecordCrudManager
+from database.mysql import close_db, init_db
+
+ExamRecordCrud = ExamRecordCrudManager()
+
+
+async def backfill_exam_answers(batch_size: int):
+    after_id = ""
+    record_count = 0
+    answer_count = 0
+
+    while True:
+        exam_records = await ExamRecordCrud.get_without_answers(after_id, batch_size)
+        if not exam_records:
+            break
+
+        answer_count += await ExamRecordCrud.create_answers(exam_records)
+        record_count += len(exam_records)
+        after_id = exam_records[-1].id
+        print(f"backfilled {record_count} exam records ({answer_count} answers)")
+
+    print(f"done: {record_count} exam records, {answer_count} answers")
+
+
+async def main():
+    parser = ArgumentParser(description="Backfill ExamAnswer from ExamRecord")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    try:
+        await init_db()
+        await backfill_exam_answers(args.batch_size)
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    run(main())
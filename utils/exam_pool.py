@@ -0,0 +1,116 @@
+from asyncio import CancelledError, Event, create_task
+from collections import deque
+from logging import getLogger
+from random import sample
+
+from database.mysql import exam_priority
+from settings.configs import get_settings
+from settings.subject import SUBJECT_EXAM_INFO
+from utils.question_bank import question_bank
+
+logger = getLogger(__name__)
+settings = get_settings()
+
+
+def sample_papers(bank, exam_type, count):
+    question_num = min(
+        SUBJECT_EXAM_INFO[exam_type]["question_count"], len(bank.active)
+    )
+    return [bank.paper(sample(bank.active, question_num)) for _ in range(count)]
+
+
+class ExamPaperPool:
+    """
+    每種測驗預先產生一批試卷，開始測驗時直接取出一份，
+    數量低於 low_water_mark 時由背景工作補充至 size。
+    """
+
+    def __init__(self, size: int, low_water_mark: int):
+        self.size = size
+        self.low_water_mark = low_water_mark
+        self.papers = {exam_type: deque() for exam_type in SUBJECT_EXAM_INFO}
+        self.generations = {exam_type: 0 for exam_type in SUBJECT_EXAM_INFO}
+        self._refill_event = None
+        self._task = None
+
+    async def refill(self, exam_type: str):
+        papers = self.papers[exam_type]
+        missing = self.size - len(papers)
+        if missing <= 0:
+            return
+
+        generation = self.generations[exam_type]
+        subject = SUBJECT_EXAM_INFO[exam_type]["subject"]
+        bank = await question_bank.get(subject)
+
+        # Drop papers sampled from a question bank that changed meanwhile
+        if generation != self.generations[exam_type]:
+            return
+
+        papers.extend(sample_papers(bank, exam_type, missing))
+
+    async def pop(self, exam_type: str):
+        # Drops the pooled papers if questions were changed by an offline tool
+        question_bank.check_stamp()
+        papers = self.papers[exam_type]
+        if len(papers) <= self.low_water_mark:
+            self.request_refill()
+
+        if papers:
+            return papers.popleft()
+
+        # Pool is empty (cold start or just invalidated), sample directly
+        subject = SUBJECT_EXAM_INFO[exam_type]["subject"]
+        bank = await question_bank.get(subject)
+        return sample_papers(bank, exam_type, 1)[0]
+
+    def invalidate(self, subject: str):
+        for exam_type, info in SUBJECT_EXAM_INFO.items():
+            if info["subject"] == subject:
+                self.papers[exam_type].clear()
+                self.generations[exam_type] += 1
+
+        self.request_refill()
+
+    def request_refill(self):
+        if self._refill_event:
+            self._refill_event.set()
+
+    async def _refill_worker(self):
+        # Serves exams, may use the DB connections reserved for them
+        exam_priority.set(True)
+        while True:
+            await self._refill_event.wait()
+            self._refill_event.clear()
+
+            for exam_type in SUBJECT_EXAM_INFO:
+                try:
+                    await self.refill(exam_type)
+                except CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Failed to refill exam papers: %s", exam_type)
+
+    def start(self):
+        self._refill_event = Event()
+        self._refill_event.set()
+        self._task = create_task(self._refill_worker())
+
+    async def stop(self):
+        if not self._task:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except CancelledError:
+            pass
+        self._task = None
+        self._refill_event = None
+
+
+exam_paper_pool = ExamPaperPool(
+    size=settings.EXAM_POOL_SIZE,
+    low_water_mark=settings.EXAM_POOL_LOW_WATER_MARK,
+)
+question_bank.listeners.append(exam_paper_pool.invalidate)
@@ -0,0 +1,69 @@
+from collections import OrderedDict, namedtuple
+from secrets import token_urlsafe
+from time import monotonic
+
+from settings.configs import get_settings
+from settings.subject import SUBJECT_EXAM_INFO
+
+settings = get_settings()
+
+# 發出試卷時記錄的測驗資訊 (題目 id 與答案依出題順序排列)
+ExamSession = namedtuple(
+    "ExamSession",
+    ["user_id", "exam_type", "question_ids", "answers", "expires_at"],
+)
+
+
+class ExamSessionStore:
+    """
+    記錄已發出的試卷，交卷時只接受該份試卷中的題目並直接以此計分。
+    超過作答時間加上 grace_period 的紀錄會失效；數量超過 max_size 時淘汰最舊的紀錄。
+    """
+
+    def __init__(self, max_size: int, grace_period: int):
+        self.max_size = max_size
+        self.grace_period = grace_period
+        self.sessions = OrderedDict()
+
+    def _purge(self):
+        now = monotonic()
+        while self.sessions:
+            session_id, session = next(iter(self.sessions.items()))
+            if session.expires_at > now and len(self.sessions) < self.max_size:
+                break
+            del self.sessions[session_id]
+
+    def create(self, user_id: str, exam_type: str, paper):
+        self._purge()
+
+        session_id = token_urlsafe(16)
+        time_limit = SUBJECT_EXAM_INFO[exam_type]["time_limit"]
+        self.sessions[session_id] = ExamSession(
+            user_id=user_id,
+            exam_type=exam_type,
+            question_ids=tuple(question.id for question in paper),
+            answers=tuple(question.answer for question in paper),
+            expires_at=monotonic() + time_limit + self.grace_period,
+        )
+
+        return session_id
+
+    def get(self, session_id: str):
+        session = self.sessions.get(session_id)
+        if not session or session.expires_at <= monotonic():
+            return None
+
+        return session
+
+    def remove(self, session_id: str):
+        self.sessions.pop(session_id, None)
+
+    def restore(self, session_id: str, session: ExamSession):
+        # Put back a removed session (keeps its original expiry)
+        self.sessions[session_id] = session
+
+
+exam_session_store = ExamSessionStore(
+    max_size=settings.EXAM_SESSION_MAX_SIZE,
+    grace_period=settings.EXAM_SESSION_GRACE_PERIOD,
+)
@@ -0,0 +1,26 @@
+from csv import writer
+from io import StringIO
+
+
+async def stream_csv(header, row_chunks, format_row=tuple):
+    """
+    將分批取得的資料列轉為 CSV，每批輸出一段字串供 StreamingResponse 傳送。
+    """
+    buffer = StringIO()
+    csv_writer = writer(buffer)
+    csv_writer.writerow(header)
+
+    async for rows in row_chunks:
+        csv_writer.writerows(format_row(row) for row in rows)
+        yield buffer.getvalue()
+
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    # Header only (no rows)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def csv_download_headers(csv_filename: str):
+    return {"Content-Disposition": f"attachment; filename={csv_filename}"}
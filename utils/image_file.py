@@ -0,0 +1,169 @@
+from hashlib import sha256
+from logging import getLogger
+from os import link, replace, scandir, stat, unlink, utime
+from pathlib import Path
+from re import compile
+from shutil import copyfile
+from tempfile import NamedTemporaryFile
+from time import time
+
+from starlette.concurrency import run_in_threadpool
+
+from crud.question import QuestionCrudManager
+from settings.configs import get_settings
+
+logger = getLogger(__name__)
+settings = get_settings()
+QuestionCrud = QuestionCrudManager()
+
+IMAGE_NAME_PATTERN = compile(r".+_([0-9a-f-]{36})\.jpg")
+IMAGE_HASH_PATTERN = compile(r"([0-9a-f]{64})\.jpg")
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def image_store_dir():
+    return Path(settings.PROTECTED_IMG_DIR) / settings.IMAGE_STORE_DIRNAME
+
+
+def image_store_path(image_hash: str):
+    # Fan out by hash prefix, e.g. 2 levels of 2 hex digits: images/ab/cd/abcd....jpg
+    width = settings.IMAGE_STORE_FANOUT_WIDTH
+    shards = [
+        image_hash[level * width : (level + 1) * width]
+        for level in range(settings.IMAGE_STORE_FANOUT_LEVELS)
+    ]
+    return image_store_dir().joinpath(*shards, f"{image_hash}.jpg")
+
+
+def hash_image_file(image_path: str):
+    digest = sha256()
+    with open(image_path, "rb") as file:
+        for chunk in iter(lambda: file.read(COPY_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_image(src):
+    """
+    一邊寫入暫存檔一邊計算 SHA-256，以雜湊值作為檔名 ({雜湊}.jpg)，內容相同的圖片只存一份。
+    已存在時只更新其修改時間 (見 remove_unreferenced_images)。回傳 (雜湊, 路徑)。
+    """
+    directory = image_store_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    digest = sha256()
+    tmp = NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False)
+    try:
+        with tmp:
+            for chunk in iter(lambda: src.read(COPY_CHUNK_SIZE), b""):
+                digest.update(chunk)
+                tmp.write(chunk)
+    except BaseException:
+        unlink(tmp.name)
+        raise
+
+    image_hash = digest.hexdigest()
+    image_path = image_store_path(image_hash)
+    try:
+        utime(image_path)
+        unlink(tmp.name)
+    except FileNotFoundError:
+        image_path.parent.mkdir(parents=True, exist_ok=True)
+        replace(tmp.name, image_path)
+
+    return image_hash, str(image_path)
+
+
+def link_into_store(image_path: str, image_hash: str):
+    """
+    將既有圖片檔放入圖片庫中對應雜湊的位置 (已存在時不覆寫)，原檔保留至資料庫更新後再移除。
+    同一檔案系統以 hard link 完成，否則複製後再 rename。回傳新路徑。
+    """
+    target = image_store_path(image_hash)
+    if target.exists():
+        return str(target)
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        link(image_path, target)
+    except FileExistsError:
+        pass
+    except OSError:
+        tmp = target.with_suffix(".tmp")
+        copyfile(image_path, tmp)
+        replace(tmp, target)
+
+    return str(target)
+
+
+# 刪除題目後移除對應的圖片檔 (於背景執行)
+def remove_image_files(image_paths: list[str]):
+    for image_path in image_paths:
+        try:
+            Path(image_path).unlink(missing_ok=True)
+        except OSError:
+            logger.warning("Failed to remove image file: %s", image_path)
+
+
+def _remove_stale_image_files(image_paths: list[str], cutoff: float):
+    for image_path in image_paths:
+        try:
+            # Stored again by an import in progress, left for image_reconcile
+            if stat(image_path).st_mtime >= cutoff:
+                continue
+            unlink(image_path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logger.warning("Failed to remove image file: %s", image_path)
+
+
+async def remove_unreferenced_images(questions):
+    """
+    刪除題目後 (於背景執行)，移除已沒有其他題目引用的圖片檔。
+    最近 remove_grace_period 秒內被重新存入的圖片可能即將被新題目引用，暫不移除。
+    """
+    referenced = await QuestionCrud.get_referenced_image_hashes(
+        [q.image_hash for q in questions]
+    )
+    image_paths = {q.image_path for q in questions if q.image_hash not in referenced}
+    cutoff = time() - settings.IMAGE_REMOVE_GRACE_PERIOD
+    await run_in_threadpool(_remove_stale_image_files, list(image_paths), cutoff)
+
+
+# 由圖片檔名 ({題目編號}_{題目 id}.jpg) 取得題目 id
+def question_id_from_image_name(image_name: str):
+    match = IMAGE_NAME_PATTERN.fullmatch(image_name)
+    return match.group(1) if match else None
+
+
+# 由圖片庫的檔名 ({雜湊}.jpg) 取得雜湊值
+def image_hash_from_image_name(image_name: str):
+    match = IMAGE_HASH_PATTERN.fullmatch(image_name)
+    return match.group(1) if match else None
+
+
+def scan_image_files(directory: str, chunk_size: int):
+    """
+    以 os.scandir 走訪圖片目錄 (含子目錄)，每累積 chunk_size 個檔案輸出一批 DirEntry。
+    """
+    chunk = []
+    pending = [directory]
+    while pending:
+        try:
+            entries = scandir(pending.pop())
+        except FileNotFoundError:
+            continue
+
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    chunk.append(entry)
+                    if len(chunk) >= chunk_size:
+                        yield chunk
+                        chunk = []
+
+    if chunk:
+        yield chunk
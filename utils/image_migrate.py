@@ -0,0 +1,160 @@
+"""
+將既有的題目圖片 (舊的 math / nature_science 目錄，或未分層的圖片庫) 搬到圖片庫目前設定的
+雜湊前綴分層位置 (image_store.fanout_levels / fanout_width)，並分批更新資料庫中的 image_path。
+
+開始前與服務啟動時相同，先補上資料表缺少的欄位 (舊資料庫的 image_hash 以 NULL 加入)，
+搬移時再由圖片檔內容計算並寫入 image_hash。
+
+系統運作中即可執行：先以 hard link (或複製) 建立新檔，更新該批題目後，
+等待 --pause 秒才移除已沒有題目引用的舊檔。進度記錄於 --checkpoint 檔，中斷後重新執行即從該處繼續。
+
+執行方式 (於專案根目錄)：
+    python -m utils.image_migrate              # 搬移
+    python -m utils.image_migrate --dry-run    # 僅統計需要搬移的數量
+    python -m utils.image_migrate --restart    # 忽略進度檔，從頭開始
+"""
+
+from argparse import ArgumentParser
+from asyncio import run, sleep
+from json import dump, load
+from pathlib import Path
+
+from crud.question import QuestionCrudManager
+from database.mysql import close_db, init_db
+from utils.image_file import (
+    hash_image_file,
+    image_store_path,
+    link_into_store,
+    remove_image_files,
+)
+
+QuestionCrud = QuestionCrudManager()
+
+
+def load_checkpoint(checkpoint: Path):
+    if not checkpoint.exists():
+        return None
+
+    with open(checkpoint) as file:
+        return load(file)["after_id"]
+
+
+def save_checkpoint(checkpoint: Path, after_id: str):
+    tmp = checkpoint.with_suffix(".tmp")
+    with open(tmp, "w") as file:
+        dump({"after_id": after_id}, file)
+    tmp.replace(checkpoint)
+
+
+def plan_moves(rows, dry_run: bool):
+    """
+    決定該批題目的新路徑，回傳 (更新內容, 圖片檔不存在的題目數)。
+    舊資料的 image_hash 為 NULL (由 init_db 補上的欄位)，由檔案內容計算。
+    """
+    updates = []
+    missing = 0
+    for row in rows:
+        try:
+            image_hash = row.image_hash or hash_image_file(row.image_path)
+        except FileNotFoundError:
+            missing += 1
+            continue
+
+        new_image_path = str(image_store_path(image_hash))
+        if row.image_path == new_image_path:
+            continue
+
+        if not dry_run:
+            try:
+                link_into_store(row.image_path, image_hash)
+            except FileNotFoundError:
+                missing += 1
+                continue
+
+        updates.append(
+            {
+                "question_id": row.id,
+                "old_image_path": row.image_path,
+                "new_image_path": new_image_path,
+                "new_image_hash": image_hash,
+            }
+        )
+    return updates, missing
+
+
+async def migrate_images(
+    batch_size: int,
+    pause: float,
+    checkpoint: Path,
+    dry_run: bool,
+    restart: bool,
+):
+    after_id = None if restart or dry_run else load_checkpoint(checkpoint)
+    if after_id:
+        print(f"resuming after question {after_id}")
+
+    moved_count = 0
+    missing_count = 0
+    while True:
+        rows = await QuestionCrud.get_image_page(after_id, batch_size)
+        if not rows:
+            break
+
+        updates, missing = plan_moves(rows, dry_run)
+        moved_count += len(updates)
+        missing_count += missing
+        after_id = rows[-1].id
+        if dry_run:
+            continue
+
+        if updates:
+            await QuestionCrud.update_image_paths(updates)
+
+            # Readers that fetched a row before the update may still open the old file
+            await sleep(pause)
+            referenced = await QuestionCrud.get_image_paths_by_hashes(
+                [update["new_image_hash"] for update in updates]
+            )
+            remove_image_files(
+                [
+                    old_image_path
+                    for old_image_path in {u["old_image_path"] for u in updates}
+                    if old_image_path not in referenced
+                ]
+            )
+
+        save_checkpoint(checkpoint, after_id)
+        print(f"{moved_count} images moved (up to question {after_id})")
+
+    action = "to move" if dry_run else "moved"
+    print(f"{moved_count} images {action}")
+    print(f"{missing_count} questions without image file (see utils.image_reconcile)")
+    if not dry_run:
+        checkpoint.unlink(missing_ok=True)
+
+
+async def main():
+    parser = ArgumentParser(description="Move question images into the fan-out layout")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--pause", type=float, default=1.0, help="seconds")
+    parser.add_argument("--checkpoint", default=".image_migrate_checkpoint.json")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--restart", action="store_true")
+    args = parser.parse_args()
+
+    try:
+        # Adds image_hash (nullable) to a database created before the image store
+        await init_db()
+        await migrate_images(
+            args.batch_size,
+            args.pause,
+            Path(args.checkpoint),
+            args.dry_run,
+            args.restart,
+        )
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    run(main())
@@ -0,0 +1,183 @@
+"""
+比對圖片目錄與資料庫中的題目，找出沒有題目引用的圖片檔 (orphan) 以及圖片檔已不存在的題目 (dangling)。
+
+執行方式 (於專案根目錄)：
+    python -m utils.image_reconcile                               # 僅列出
+    python -m utils.image_reconcile --remove                      # 刪除 orphan 圖片檔
+    python -m utils.image_reconcile --remove-dangling-questions   # 刪除 dangling 題目
+
+刪除 dangling 題目會一併刪除其作答紀錄，並通知執行中的服務重新載入題庫。
+圖片目錄不存在，或同一批題目中超過半數找不到圖片檔時 (圖片目錄未掛載或路徑設定錯誤)，
+視為設定問題而中止，不會刪除任何資料。
+"""
+
+from argparse import ArgumentParser
+from asyncio import run
+from os.path import exists, realpath
+from pathlib import Path
+from time import time
+
+from crud.question import QuestionCrudManager
+from database.mysql import close_db
+from settings.configs import get_settings
+from utils.image_file import (
+    image_hash_from_image_name,
+    image_store_dir,
+    question_id_from_image_name,
+    remove_image_files,
+    scan_image_files,
+)
+from utils.question_bank import mark_question_bank_changed
+
+settings = get_settings()
+QuestionCrud = QuestionCrudManager()
+
+
+def image_directories():
+    base_path = Path(settings.PROTECTED_IMG_DIR)
+    return [
+        str(base_path / settings.MATH_DIRNAME),
+        str(base_path / settings.NATURE_SCIENCE_DIRNAME),
+    ]
+
+
+class ImagePathMismatchError(Exception):
+    pass
+
+
+async def find_orphan_image_files(chunk_size: int, min_age: int):
+    # Skip recently written files (imports in progress write the file before the row)
+    cutoff = time() - min_age
+
+    for directory in image_directories():
+        for entries in scan_image_files(directory, chunk_size):
+            question_ids = {question_id_from_image_name(e.name) for e in entries}
+            question_ids.discard(None)
+
+            rows = (
+                await QuestionCrud.get_image_paths_by_ids(list(question_ids))
+                if question_ids
+                else []
+            )
+            # Compare resolved paths (relative / absolute, trailing slash, symlink)
+            stored_paths = {row.id: row.image_path for row in rows}
+            referenced = {realpath(image_path) for image_path in stored_paths.values()}
+            unreferenced = [e for e in entries if realpath(e.path) not in referenced]
+            unreferenced_paths = {e.path for e in unreferenced}
+
+            # Files of existing questions, yet none matches its stored path: the
+            # paths point elsewhere, refuse to treat the whole bank as orphans
+            known = [
+                e
+                for e in entries
+                if question_id_from_image_name(e.name) in stored_paths
+            ]
+            if known and all(e.path in unreferenced_paths for e in known):
+                raise ImagePathMismatchError(
+                    f"No image file in {directory} matches the image paths stored "
+                    "for its questions, check paths.protected_img_dir "
+                    f"(e.g. {known[0].path} vs "
+                    f"{stored_paths[question_id_from_image_name(known[0].name)]})"
+                )
+
+            orphan_paths = [e.path for e in unreferenced if e.stat().st_mtime < cutoff]
+            if orphan_paths:
+                yield orphan_paths
+
+
+async def find_orphan_stored_images(chunk_size: int, min_age: int):
+    # Content-addressed images ({hash}.jpg) and temp files of interrupted writes
+    cutoff = time() - min_age
+
+    for entries in scan_image_files(str(image_store_dir()), chunk_size):
+        image_hashes = {image_hash_from_image_name(e.name) for e in entries}
+        image_hashes.discard(None)
+
+        referenced = (
+            await QuestionCrud.get_referenced_image_hashes(list(image_hashes))
+            if image_hashes
+            else set()
+        )
+        orphan_paths = [
+            e.path
+            for e in entries
+            if image_hash_from_image_name(e.name) not in referenced
+            and e.stat().st_mtime < cutoff
+        ]
+        if orphan_paths:
+            yield orphan_paths
+
+
+async def find_dangling_questions(chunk_size: int):
+    base_path = Path(settings.PROTECTED_IMG_DIR)
+    if not base_path.is_dir():
+        raise ImagePathMismatchError(
+            f"Image directory {base_path} does not exist, "
+            "check paths.protected_img_dir"
+        )
+
+    async for rows in QuestionCrud.stream_image_paths(chunk_size=chunk_size):
+        dangling = [row for row in rows if not exists(row.image_path)]
+        # Most image files missing at once: unmounted or misconfigured directory,
+        # refuse rather than reporting (and deleting) the whole bank
+        if len(dangling) * 2 > len(rows):
+            raise ImagePathMismatchError(
+                f"{len(dangling)} of {len(rows)} questions have no image file, "
+                "check paths.protected_img_dir "
+                f"(e.g. {dangling[0].image_path})"
+            )
+        if dangling:
+            yield dangling
+
+
+async def reconcile_images(
+    remove: bool, remove_dangling: bool, chunk_size: int, min_age: int
+):
+    orphan_count = 0
+    for find_orphans in [find_orphan_image_files, find_orphan_stored_images]:
+        async for orphan_paths in find_orphans(chunk_size, min_age):
+            for image_path in orphan_paths:
+                print(f"orphan image file: {image_path}")
+            if remove:
+                remove_image_files(orphan_paths)
+            orphan_count += len(orphan_paths)
+
+    dangling_count = 0
+    async for dangling in find_dangling_questions(chunk_size):
+        for row in dangling:
+            print(f"dangling question: {row.id} ({row.image_path})")
+        if remove_dangling:
+            await QuestionCrud.delete_by_ids([row.id for row in dangling])
+        dangling_count += len(dangling)
+
+    if remove_dangling and dangling_count:
+        mark_question_bank_changed()
+
+    print(f"{orphan_count} orphan image files {'removed' if remove else 'found'}")
+    print(
+        f"{dangling_count} dangling questions "
+        f"{'removed' if remove_dangling else 'found'}"
+    )
+
+
+async def main():
+    parser = ArgumentParser(description="Reconcile question images with database")
+    parser.add_argument("--remove", action="store_true", help="orphan image files")
+    parser.add_argument("--remove-dangling-questions", action="store_true")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--min-age", type=int, default=3600, help="seconds")
+    args = parser.parse_args()
+
+    try:
+        await reconcile_images(
+            args.remove,
+            args.remove_dangling_questions,
+            args.chunk_size,
+            args.min_age,
+        )
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    run(main())
@@ -0,0 +1,154 @@
+from asyncio import CancelledError, Queue, create_task, gather
+from logging import getLogger
+from pathlib import Path
+from shutil import copyfileobj
+from uuid import uuid4
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from crud.import_job import ImportJobCrudManager
+from models.base import Import_kind, Import_status
+from settings.configs import get_settings
+from utils.importers import ImportFileError, QuestionImporter, UserImporter
+
+logger = getLogger(__name__)
+settings = get_settings()
+ImportJobCrud = ImportJobCrudManager()
+
+IMPORTERS = {
+    Import_kind.QUESTION: QuestionImporter,
+    Import_kind.USER: UserImporter,
+}
+
+
+def _save_upload(src, upload_path: Path):
+    with upload_path.open("wb") as dst:
+        copyfileobj(src, dst)
+
+
+class ImportJobRunner:
+    """
+    批次新增題目 / 使用者的背景工作：上傳的檔案先存到 directory 並建立工作紀錄後即回應，
+    由 concurrency 個 worker 逐列處理，每 progress_interval 列將進度與失敗原因寫入資料庫。
+    重新啟動時，未完成的工作會從最後記錄的列繼續。
+    """
+
+    def __init__(self, directory: str, concurrency: int, progress_interval: int):
+        self.directory = Path(directory)
+        self.concurrency = concurrency
+        self.progress_interval = progress_interval
+        self._queue = None
+        self._workers = []
+
+    async def submit(self, created_by: str, kind: Import_kind, file: UploadFile):
+        job_id = str(uuid4())
+        upload_path = self.directory / f"{job_id}{Path(file.filename).suffix}"
+        await run_in_threadpool(_save_upload, file.file, upload_path)
+
+        job = await ImportJobCrud.create(
+            id=job_id,
+            created_by=created_by,
+            kind=kind,
+            filename=file.filename,
+            upload_path=str(upload_path),
+        )
+        self._queue.put_nowait(job.id)
+        return job
+
+    async def _run(self, job_id: str):
+        job = await ImportJobCrud.get(job_id)
+        if not job or job.status not in [Import_status.PENDING, Import_status.RUNNING]:
+            return
+
+        importer = IMPORTERS[job.kind](job.upload_path)
+        try:
+            rows = await run_in_threadpool(importer.open)
+        except ImportFileError as e:
+            importer.close()
+            await self._finish(job, Import_status.FAILED, str(e))
+            return
+        except Exception:
+            importer.close()
+            await self._finish(job, Import_status.FAILED, "檔案格式錯誤，請確認檔案內容")
+            return
+
+        await ImportJobCrud.update_status(
+            job.id, status=Import_status.RUNNING, total=len(rows)
+        )
+
+        # Continue after the last recorded row when resuming
+        processed, succeeded, failed = job.processed, job.succeeded, job.failed
+        failures = []
+        try:
+            for row in rows[processed:]:
+                try:
+                    reason = await importer.import_row(row)
+                except CancelledError:
+                    raise
+                except Exception:
+                    reason = "資料格式錯誤"
+
+                processed += 1
+                if reason:
+                    failed += 1
+                    failures.append(
+                        {
+                            "row_number": processed,
+                            "item": importer.label(row),
+                            "reason": reason,
+                        }
+                    )
+                else:
+                    succeeded += 1
+
+                if processed % self.progress_interval == 0 or processed == len(rows):
+                    await ImportJobCrud.record_progress(
+                        job.id, processed, succeeded, failed, failures
+                    )
+                    failures = []
+                    importer.checkpoint()
+        finally:
+            importer.checkpoint()
+            importer.close()
+
+        await self._finish(job, Import_status.DONE)
+
+    async def _finish(self, job, status: Import_status, error: str = ""):
+        await ImportJobCrud.update_status(job.id, status=status, error=error)
+        Path(job.upload_path).unlink(missing_ok=True)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except CancelledError:
+                raise
+            except Exception:
+                # Left unfinished, retried at the next start
+                logger.exception("Failed to run import job %s", job_id)
+
+    async def start(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._queue = Queue()
+        for job in await ImportJobCrud.get_unfinished():
+            self._queue.put_nowait(job.id)
+
+        self._workers = [
+            create_task(self._worker()) for _ in range(self.concurrency)
+        ]
+
+    async def stop(self):
+        # Running jobs stay unfinished and resume from their last checkpoint
+        for worker in self._workers:
+            worker.cancel()
+        await gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+import_job_runner = ImportJobRunner(
+    directory=settings.IMPORT_JOBS_DIR,
+    concurrency=settings.IMPORT_JOBS_CONCURRENCY,
+    progress_interval=settings.IMPORT_JOBS_PROGRESS_INTERVAL,
+)
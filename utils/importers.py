@@ -0,0 +1,167 @@
+from csv import DictReader
+from io import StringIO
+from pathlib import Path
+from uuid import uuid4
+from zipfile import ZipFile
+
+from starlette.concurrency import run_in_threadpool
+
+from auth.passwd import get_password_hash
+from crud.question import QuestionCrudManager
+from crud.user import UserCrudManager
+from models.base import Role
+from schemas import user as UserSchema
+from utils.image_file import store_image
+from utils.question import (
+    is_invalid_answer_format,
+    is_invalid_serial_number,
+    sorted_answer,
+)
+from utils.question_bank import question_bank
+
+QuestionCrud = QuestionCrudManager()
+UserCrud = UserCrudManager()
+
+
+class ImportFileError(Exception):
+    pass
+
+
+def _field(row: dict, name: str):
+    # Short rows leave missing fields as None
+    return (row.get(name) or "").strip()
+
+
+class QuestionImporter:
+    """
+    批次新增題目：ZIP 檔包含一份題目 CSV 清單 (filename, answer) 及所有題目 JPG 圖檔。
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.zip_file = None
+        self.images = {}
+        self.added_subjects = set()
+
+    def open(self):
+        self.zip_file = ZipFile(self.path)
+        names = self.zip_file.namelist()
+
+        # Check if zip contains a CSV file
+        csv_filename = next((name for name in names if name.endswith(".csv")), None)
+        if not csv_filename:
+            raise ImportFileError("ZIP 壓縮檔中找不到 CSV 檔案")
+
+        # Image lookup by file name instead of scanning the name list for every row
+        for name in names:
+            self.images.setdefault(Path(name).name, name)
+
+        with self.zip_file.open(csv_filename) as csv_file:
+            return list(DictReader(StringIO(csv_file.read().decode("utf-8"))))
+
+    def label(self, row: dict):
+        return _field(row, "filename")
+
+    def _store_image(self, zip_image_path: str):
+        with self.zip_file.open(zip_image_path) as src:
+            return store_image(src)
+
+    async def import_row(self, row: dict):
+        """新增一題，失敗時回傳原因。"""
+        csv_filename = _field(row, "filename")
+        answer = _field(row, "answer")
+
+        # Check if answer format is valid
+        if is_invalid_answer_format(answer):
+            return "答案格式錯誤"
+
+        # Check if serial number (file name) fits before writing the image
+        serial_number = Path(csv_filename).stem
+        if is_invalid_serial_number(serial_number):
+            return "檔案名稱過長或為空"
+
+        # Check if question already exists
+        existing_question = await QuestionCrud.get_by_filename(serial_number)
+        if existing_question:
+            return "題目已存在"
+
+        # Check if image exists in zip
+        zip_image_path = self.images.get(csv_filename)
+        if not zip_image_path:
+            return "找不到對應圖片檔"
+
+        # Save image to disk (stored once per content hash)
+        is_math = csv_filename.startswith("M")
+        subject = "math" if is_math else "nature_science"
+        image_hash, image_path = await run_in_threadpool(
+            self._store_image, zip_image_path
+        )
+
+        # Write into database
+        await QuestionCrud.create(
+            id=str(uuid4()),
+            subject=subject,
+            serial_number=serial_number,
+            image_path=image_path,
+            image_hash=image_hash,
+            answer=sorted_answer(answer),
+        )
+        self.added_subjects.add(subject)
+
+    def checkpoint(self):
+        # Refresh pooled exam papers with the newly added questions
+        for subject in self.added_subjects:
+            question_bank.invalidate(subject)
+        self.added_subjects.clear()
+
+    def close(self):
+        if self.zip_file:
+            self.zip_file.close()
+
+
+class UserImporter:
+    """
+    批次新增使用者：CSV 檔包含 username, password, name, role 欄位，不可新增管理員。
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def open(self):
+        with open(self.path, encoding="utf-8") as file:
+            return list(DictReader(file))
+
+    def label(self, row: dict):
+        return _field(row, "username")
+
+    async def import_row(self, row: dict):
+        """新增一位使用者，失敗時回傳原因。"""
+        username = _field(row, "username")
+        role = _field(row, "role")
+
+        # Check if user_to_add is admin
+        if role == Role.ADMIN:
+            return "無法新增管理員帳號"
+
+        # Check if user with the same username already exists
+        user_to_add = await UserCrud.get_by_username(username)
+        if user_to_add:
+            return "使用者帳號已存在"
+
+        newUser = UserSchema.UserCreate(
+            username=username,
+            password=_field(row, "password"),
+            name=_field(row, "name"),
+            role=role,
+        )
+        # bcrypt is CPU bound, keep it off the event loop
+        newUser.password = await run_in_threadpool(
+            get_password_hash, newUser.password
+        )
+        await UserCrud.create(newUser)
+
+    def checkpoint(self):
+        pass
+
+    def close(self):
+        pass
@@ -0,0 +1,170 @@
+from starlette.concurrency import run_in_threadpool
+
+from crud.exam_record import ExamRecordCrudManager
+from crud.question import QuestionCrudManager
+from utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+ExamRecordCrud = ExamRecordCrudManager()
+QuestionCrud = QuestionCrudManager()
+
+OPTIONS = "ABCD"
+
+ITEM_ANALYSIS_HEADER = [
+    "serial_number",
+    "answer",
+    "responses",
+    "p_value",
+    "point_biserial",
+    *[f"option_{option}" for option in OPTIONS],
+    "flags",
+]
+
+
+async def load_response_matrix(subject: str, question_index: dict):
+    """
+    讀取該科目所有作答，組成 (測驗紀錄 × 題目) 的稀疏作答矩陣 (COO 格式)：
+    rows / cols 為紀錄與題目索引，correct 為是否答對，choices 為作答選項的位元遮罩 (A=1, B=2, C=4, D=8)。
+    """
+    record_index = {}
+    rows, cols, correct, choices = [], [], [], []
+
+    async for chunk in ExamRecordCrud.stream_answers_by_subject(subject):
+        # Skip questions added after the question list was read
+        chunk = [
+            (record_id, question_index[question_id], user_answer, is_correct)
+            for record_id, question_id, user_answer, is_correct in chunk
+            if question_id in question_index
+        ]
+        if not chunk:
+            continue
+        record_ids, question_cols, user_answers, is_correct = zip(*chunk)
+
+        rows.append(
+            np.fromiter(
+                (record_index.setdefault(rid, len(record_index)) for rid in record_ids),
+                dtype=np.int64,
+                count=len(chunk),
+            )
+        )
+        cols.append(np.fromiter(question_cols, dtype=np.int64, count=len(chunk)))
+        correct.append(np.fromiter(is_correct, dtype=np.float64, count=len(chunk)))
+
+        answers = np.array(user_answers, dtype=str)
+        mask = np.zeros(len(chunk), dtype=np.int64)
+        for bit, option in enumerate(OPTIONS):
+            mask |= (np.char.find(answers, option) >= 0).astype(np.int64) << bit
+        choices.append(mask)
+
+    if not rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty.astype(np.float64), empty
+
+    return (
+        np.concatenate(rows),
+        np.concatenate(cols),
+        np.concatenate(correct),
+        np.concatenate(choices),
+    )
+
+
+def compute_item_statistics(rows, cols, correct, choices, question_count: int):
+    """
+    向量化計算每題的難度 (p-value)、點二系列相關 (point-biserial discrimination) 及各選項選答比例。
+    每份試卷題目不同，總分以該份紀錄的答對比例計算。
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Proportion correct of each exam record
+        record_count = rows.max() + 1 if rows.size else 0
+        answered = np.bincount(rows, minlength=record_count)
+        record_correct = np.bincount(rows, weights=correct, minlength=record_count)
+        totals = (record_correct / answered)[rows]
+
+        # Difficulty
+        n = np.bincount(cols, minlength=question_count).astype(np.float64)
+        c = np.bincount(cols, weights=correct, minlength=question_count)
+        p_value = c / n
+
+        # Point-biserial correlation between item correctness and total
+        sum_t = np.bincount(cols, weights=totals, minlength=question_count)
+        sum_t2 = np.bincount(cols, weights=totals * totals, minlength=question_count)
+        sum_t_correct = np.bincount(
+            cols, weights=totals * correct, minlength=question_count
+        )
+        mean_t = sum_t / n
+        sd_t = np.sqrt(np.maximum(sum_t2 / n - mean_t * mean_t, 0))
+        mean_correct = sum_t_correct / c
+        mean_wrong = (sum_t - sum_t_correct) / (n - c)
+        point_biserial = (
+            (mean_correct - mean_wrong) / sd_t * np.sqrt(p_value * (1 - p_value))
+        )
+        point_biserial[(c == 0) | (c == n) | (sd_t == 0)] = np.nan
+
+        # Frequency of each option
+        option_frequencies = np.stack(
+            [
+                np.bincount(cols, weights=(choices >> bit) & 1, minlength=question_count)
+                / n
+                for bit in range(len(OPTIONS))
+            ],
+            axis=1,
+        )
+
+    return n, p_value, point_biserial, option_frequencies
+
+
+def item_flags(p_value, point_biserial):
+    flags = []
+    if p_value > 0.9:
+        flags.append("too_easy")
+    if p_value < 0.2:
+        flags.append("too_hard")
+    if point_biserial < 0.2:
+        flags.append("low_discrimination")
+    return " ".join(flags)
+
+
+def _format_ratio(value):
+    return "" if np.isnan(value) else f"{value:.3f}"
+
+
+async def get_item_analysis(subject: str):
+    questions = sorted(
+        await QuestionCrud.get_by_subject(subject),
+        key=lambda q: q.serial_number or "",
+    )
+    question_index = {q.id: i for i, q in enumerate(questions)}
+
+    rows, cols, correct, choices = await load_response_matrix(subject, question_index)
+    n, p_value, point_biserial, option_frequencies = await run_in_threadpool(
+        compute_item_statistics, rows, cols, correct, choices, len(questions)
+    )
+
+    items = []
+    for i, question in enumerate(questions):
+        items.append(
+            {
+                "serial_number": question.serial_number,
+                "answer": question.answer,
+                "responses": int(n[i]),
+                "p_value": _format_ratio(p_value[i]),
+                "point_biserial": _format_ratio(point_biserial[i]),
+                "options": [_format_ratio(f) for f in option_frequencies[i]],
+                "flags": item_flags(p_value[i], point_biserial[i]) if n[i] else "",
+            }
+        )
+
+    return items
+
+
+def item_analysis_csv_row(item):
+    return [
+        item["serial_number"],
+        item["answer"],
+        item["responses"],
+        item["p_value"],
+        item["point_biserial"],
+        *item["options"],
+        item["flags"],
+    ]
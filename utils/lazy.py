@@ -0,0 +1,19 @@
+import sys
+from importlib.util import LazyLoader, find_spec, module_from_spec
+
+
+def lazy_import(name: str):
+    """
+    延遲載入較少使用的大型模組，第一次存取其屬性時才真正執行 import，
+    以縮短啟動時間並降低未使用該功能的 worker 記憶體用量。
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = find_spec(name)
+    loader = LazyLoader(spec.loader)
+    spec.loader = loader
+    module = module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
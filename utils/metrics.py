@@ -0,0 +1,194 @@
+from asyncio import CancelledError, create_task, get_running_loop, sleep
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from threading import Lock
+
+from settings.configs import get_settings
+
+settings = get_settings()
+
+
+def _format_labels(labelnames, labels):
+    if not labelnames:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for name, value in zip(labelnames, labels)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """只會增加的指標；也可傳入 collect 函式，在輸出時才讀取 (labels, value)。"""
+
+    def __init__(self, name: str, help: str, labelnames=(), collect=None):
+        self.name = name
+        self.help = help
+        self.type = "counter"
+        self.labelnames = tuple(labelnames)
+        self.values = defaultdict(int)
+        self.collect = collect
+
+    def inc(self, *labels, amount=1):
+        self.values[labels] += amount
+
+    def samples(self):
+        values = self.collect() if self.collect else self.values.items()
+        for labels, value in values:
+            yield self.name, self.labelnames, labels, value
+
+
+class Gauge:
+    """數值可增減的指標；也可傳入 collect 函式，在輸出時才讀取 (labels, value)。"""
+
+    def __init__(self, name: str, help: str, labelnames=(), collect=None):
+        self.name = name
+        self.help = help
+        self.type = "gauge"
+        self.labelnames = tuple(labelnames)
+        self.values = defaultdict(float)
+        self.collect = collect
+
+    def set(self, value, *labels):
+        self.values[labels] = value
+
+    def inc(self, *labels, amount=1):
+        self.values[labels] += amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def samples(self):
+        values = self.collect() if self.collect else self.values.items()
+        for labels, value in values:
+            yield self.name, self.labelnames, labels, value
+
+
+class Histogram:
+    """固定區間的直方圖，每次記錄只需一次二分搜尋與兩次加法。"""
+
+    def __init__(self, name: str, help: str, buckets, labelnames=()):
+        self.name = name
+        self.help = help
+        self.type = "histogram"
+        self.labelnames = tuple(labelnames)
+        self.buckets = sorted(buckets)
+        self.counts = {}
+        self.sums = defaultdict(float)
+
+    def observe(self, value, *labels):
+        counts = self.counts.get(labels)
+        if counts is None:
+            counts = self.counts[labels] = [0] * (len(self.buckets) + 1)
+        counts[bisect_left(self.buckets, value)] += 1
+        self.sums[labels] += value
+
+    def samples(self):
+        labelnames = self.labelnames + ("le",)
+        for labels, counts in self.counts.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + [float("inf")], counts):
+                cumulative += count
+                yield self.name + "_bucket", labelnames, labels + (bound,), cumulative
+            yield self.name + "_sum", self.labelnames, labels, self.sums[labels]
+            yield self.name + "_count", self.labelnames, labels, cumulative
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """以 Prometheus 文字格式 (text/plain; version=0.0.4) 輸出所有指標。"""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labelnames, labels, value in metric.samples():
+                labels = tuple(_format_value(label) for label in labels)
+                lines.append(
+                    f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+bcrypt_in_flight = registry.register(
+    Gauge("qb_bcrypt_in_flight", "bcrypt hash / verify operations in progress")
+)
+bcrypt_operations = registry.register(
+    Counter("qb_bcrypt_operations_total", "bcrypt operations", ["operation"])
+)
+# bcrypt also runs in threadpool workers (bulk user import)
+_bcrypt_lock = Lock()
+
+
+@contextmanager
+def track_bcrypt(operation: str):
+    with _bcrypt_lock:
+        bcrypt_in_flight.inc()
+        bcrypt_operations.inc(operation)
+    try:
+        yield
+    finally:
+        with _bcrypt_lock:
+            bcrypt_in_flight.dec()
+
+
+image_bytes_served = registry.register(
+    Counter("qb_question_image_bytes_total", "Question image bytes served")
+)
+loop_lag = registry.register(
+    Histogram(
+        "qb_event_loop_lag_seconds",
+        "Delay of a periodic event loop timer beyond its schedule",
+        settings.METRICS_LOOP_LAG_BUCKETS,
+    )
+)
+
+
+class LoopLagMonitor:
+    """每 interval 秒排定一次計時器，記錄實際喚醒比預定晚了多久 (event loop 被阻塞的時間)。"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task = None
+
+    async def _monitor(self):
+        loop = get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await sleep(self.interval)
+            loop_lag.observe(max(loop.time() - scheduled, 0.0))
+
+    def start(self):
+        self._task = create_task(self._monitor())
+
+    async def stop(self):
+        if not self._task:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except CancelledError:
+            pass
+        self._task = None
+
+
+loop_lag_monitor = LoopLagMonitor(interval=settings.METRICS_LOOP_LAG_INTERVAL)
@@ -0,0 +1,82 @@
+from random import sample
+
+from crud.exam_seen_question import ExamSeenQuestionCrudManager
+from settings.configs import get_settings
+from settings.subject import SUBJECT_EXAM_INFO
+from utils.cache import LRUCache
+from utils.question_bank import question_bank, to_bitset
+
+settings = get_settings()
+ExamSeenQuestionCrud = ExamSeenQuestionCrudManager()
+
+
+def iter_bits(bits: int):
+    # Byte by byte, so the cost is the bitset size plus the number of set bits
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for offset, byte in enumerate(data):
+        while byte:
+            lowest = byte & -byte
+            yield offset * 8 + lowest.bit_length() - 1
+            byte ^= lowest
+
+
+def sample_bits(bits: int, count: int):
+    """從位元集合 (例如尚未出過的題目) 列舉所有索引後隨機取出 count 個。"""
+    indices = list(iter_bits(bits))
+    return sample(indices, min(count, len(indices)))
+
+
+class NoRepeatSelector:
+    """
+    記錄每位學生在各測驗類型本輪已出過的題目 (以題庫連續索引為位元的 bitset)，
+    出題時只從未出過的題目抽取，全部出過一輪後重新開始。
+    已出過的題目同時寫入 ExamSeenQuestion (新的一輪開始時清空)，
+    快取中沒有的學生由該資料表重建，不需掃描作答紀錄。
+    """
+
+    def __init__(self, max_students: int):
+        self.seen = LRUCache("no_repeat_seen", max_students)
+
+    async def _load(self, user_id: str, exam_type: str, bank):
+        indices = []
+        for question_id in await ExamSeenQuestionCrud.get_question_ids(
+            user_id, exam_type
+        ):
+            i = bank.index.get(question_id)
+            if i is not None:
+                indices.append(i)
+        return to_bitset(indices, len(bank))
+
+    async def choose(self, user_id: str, exam_type: str):
+        info = SUBJECT_EXAM_INFO[exam_type]
+        bank = await question_bank.get(info["subject"])
+        key = (user_id, exam_type)
+        seen = self.seen.get(key)
+        if seen is None:
+            seen = await self._load(user_id, exam_type, bank)
+
+        count = min(info["question_count"], len(bank.active))
+        picked = sample_bits(bank.active_bits & ~seen, count)
+        new_round = len(picked) < count
+        if new_round:
+            # All questions served, fill up from a new round; only the questions
+            # picked in the new round count as seen in it
+            rest = bank.active_bits & ~to_bitset(picked, len(bank))
+            round_picked = sample_bits(rest, count - len(picked))
+            picked += round_picked
+            seen = to_bitset(round_picked, len(bank))
+        else:
+            round_picked = picked
+            seen |= to_bitset(picked, len(bank))
+
+        self.seen.set(key, seen)
+        await ExamSeenQuestionCrud.add(
+            user_id,
+            exam_type,
+            [bank.question_ids[i] for i in round_picked],
+            new_round,
+        )
+        return bank.paper(picked)
+
+
+no_repeat_selector = NoRepeatSelector(max_students=settings.NO_REPEAT_MAX_STUDENTS)
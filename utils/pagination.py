@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+
+# 分頁游標：上一頁最後一筆的 (created_at, id)
+def encode_cursor(created_at: datetime, id: str):
+    return f"{created_at.isoformat()}_{id}"
+
+
+def decode_cursor(cursor: str):
+    if not cursor:
+        return None
+
+    created_at, _, id = cursor.partition("_")
+    try:
+        return datetime.fromisoformat(created_at), id
+    except ValueError:
+        return None
+
+
+def after_cursor(created_at_column, id_column, cursor, descending: bool = False):
+    # Rows following the cursor in (created_at, id) order
+    created_at, id = cursor
+    if descending:
+        return or_(
+            created_at_column < created_at,
+            and_(created_at_column == created_at, id_column < id),
+        )
+    return or_(
+        created_at_column > created_at,
+        and_(created_at_column == created_at, id_column > id),
+    )
+
+
+def next_cursor(rows, limit: int):
+    # rows are fetched with limit + 1 to know if there is a next page
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
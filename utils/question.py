@@ -1,3 +1,9 @@
+from models.question import Question
+
+# Serial numbers (image file name stems) longer than the column are rejected
+SERIAL_NUMBER_MAX_LENGTH = Question.__table__.c.serial_number.type.length
+
+
 def sorted_answer(answer: str):
     return "".join(sorted(list(item for item in answer.upper())))
 
@@ -8,3 +14,15 @@ def is_invalid_answer_format(answer: str):
         or not all(c in "ABCD" for c in sorted_answer(answer))
         or len(answer) > 4
     )
+
+
+def normalize_user_answer(answer: str):
+    # Student answers: unanswered stays empty, repeated letters are merged
+    answer = "".join(sorted(set(answer.upper())))
+    if answer and is_invalid_answer_format(answer):
+        return "輸入錯誤"
+    return answer
+
+
+def is_invalid_serial_number(serial_number: str):
+    return not serial_number or len(serial_number) > SERIAL_NUMBER_MAX_LENGTH
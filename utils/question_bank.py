@@ -0,0 +1,142 @@
+from asyncio import Lock
+from collections import namedtuple
+from pathlib import Path
+from time import monotonic
+
+from crud.question import QuestionCrudManager
+from models.base import Subject
+from settings.configs import get_settings
+
+settings = get_settings()
+QuestionCrud = QuestionCrudManager()
+
+# 試卷中的單一題目 (僅保留出題、計分所需欄位)
+PaperQuestion = namedtuple("PaperQuestion", ["id", "answer", "image_hash"])
+
+
+def to_bitset(indices, size: int):
+    bits = bytearray((size + 7) // 8)
+    for i in indices:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, "little")
+
+
+class SubjectBank:
+    """
+    單一科目題庫的快照。每題有固定的連續索引 (dense index)，
+    新增的題目接在最後、刪除的題目保留索引但不再列入 active，
+    因此以索引記錄的學生資料在題庫變動後仍然有效。
+    """
+
+    def __init__(self):
+        self.question_ids = []
+        self.answers = []
+        self.image_hashes = []
+        self.index = {}
+        self.active = []
+        self.active_set = frozenset()
+        self.active_bits = 0
+        self.version = 0
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def update(self, rows):
+        active = []
+        for question_id, answer, image_hash in rows:
+            i = self.index.get(question_id)
+            if i is None:
+                i = len(self.question_ids)
+                self.index[question_id] = i
+                self.question_ids.append(question_id)
+                self.answers.append(answer)
+                self.image_hashes.append(image_hash)
+            else:
+                self.answers[i] = answer
+                self.image_hashes[i] = image_hash
+            active.append(i)
+
+        self.active = sorted(active)
+        self.active_set = frozenset(active)
+        self.active_bits = to_bitset(active, len(self.question_ids))
+        self.version += 1
+
+    def image_hash(self, question_id: str):
+        i = self.index.get(question_id)
+        return self.image_hashes[i] if i is not None else None
+
+    def paper(self, indices):
+        return tuple(
+            PaperQuestion(
+                id=self.question_ids[i],
+                answer=self.answers[i],
+                image_hash=self.image_hashes[i],
+            )
+            for i in indices
+        )
+
+
+def stamp_mtime(stamp_file: Path):
+    try:
+        return stamp_file.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def mark_question_bank_changed():
+    """題目由其他行程 (例如 utils.image_reconcile) 修改後呼叫，通知服務重新載入題庫。"""
+    Path(settings.QUESTION_BANK_STAMP_FILE).touch()
+
+
+class QuestionBank:
+    def __init__(self, stamp_file: str, stamp_check_interval: float):
+        self.banks = {subject.value: SubjectBank() for subject in Subject}
+        self.stale = {subject.value: True for subject in Subject}
+        self.locks = {}
+        self.listeners = []
+        self.stamp_file = Path(stamp_file)
+        self.stamp_check_interval = stamp_check_interval
+        self._stamp = stamp_mtime(self.stamp_file)
+        self._stamp_checked_at = monotonic()
+
+    def check_stamp(self):
+        # At most one stat() per interval, the stamp changes only on offline edits
+        now = monotonic()
+        if now - self._stamp_checked_at < self.stamp_check_interval:
+            return
+        self._stamp_checked_at = now
+
+        stamp = stamp_mtime(self.stamp_file)
+        if stamp != self._stamp:
+            self._stamp = stamp
+            for subject in self.banks:
+                self.invalidate(subject)
+
+    async def get(self, subject: str):
+        self.check_stamp()
+        if self.stale[subject]:
+            lock = self.locks.setdefault(subject, Lock())
+            async with lock:
+                if self.stale[subject]:
+                    # Mark fresh first so changes made during the query reload again
+                    self.stale[subject] = False
+                    try:
+                        rows = await QuestionCrud.get_answer_keys_by_subject(subject)
+                    except BaseException:
+                        self.stale[subject] = True
+                        raise
+                    self.banks[subject].update(rows)
+
+        return self.banks[subject]
+
+    # 題目新增、刪除或修改答案後呼叫
+    def invalidate(self, subject: str):
+        self.stale[subject] = True
+        for listener in self.listeners:
+            listener(subject)
+
+
+question_bank = QuestionBank(
+    stamp_file=settings.QUESTION_BANK_STAMP_FILE,
+    stamp_check_interval=settings.QUESTION_BANK_STAMP_CHECK_INTERVAL,
+)
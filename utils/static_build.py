@@ -0,0 +1,73 @@
+"""
+靜態檔案建置：將 static/ 下的檔案複製為檔名含內容雜湊的版本 (例如 css/style.3f2a9c1e04b7.css)，
+並產生預先壓縮的 .gz / .br 檔及對照表 manifest.json，輸出至 static/dist/。
+
+執行方式 (於專案根目錄)：
+    python -m utils.static_build
+"""
+
+import gzip
+from argparse import ArgumentParser
+from hashlib import sha256
+from json import dump
+from pathlib import Path
+from shutil import rmtree
+
+import brotli
+
+from settings.configs import get_settings
+
+settings = get_settings()
+
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".svg", ".html", ".txt", ".json"}
+
+
+def hashed_name(relative: Path, data: bytes):
+    digest = sha256(data).hexdigest()[:12]
+    return relative.with_name(f"{relative.stem}.{digest}{relative.suffix}")
+
+
+def write_compressed(target: Path, data: bytes, min_size: int):
+    if target.suffix not in COMPRESSIBLE_SUFFIXES or len(data) < min_size:
+        return
+
+    for suffix, compressed in (
+        (".gz", gzip.compress(data, compresslevel=9, mtime=0)),
+        (".br", brotli.compress(data, quality=11)),
+    ):
+        if len(compressed) < len(data):
+            target.with_name(target.name + suffix).write_bytes(compressed)
+
+
+def build_static(min_size: int):
+    static_dir = Path(settings.STATIC_DIR)
+    dist_dir = static_dir / settings.STATIC_DIST_DIRNAME
+    rmtree(dist_dir, ignore_errors=True)
+
+    manifest = {}
+    for source in sorted(static_dir.rglob("*")):
+        if not source.is_file() or dist_dir in source.parents:
+            continue
+
+        data = source.read_bytes()
+        relative = source.relative_to(static_dir)
+        target = dist_dir / hashed_name(relative, data)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+        write_compressed(target, data, min_size)
+
+        manifest[relative.as_posix()] = target.relative_to(static_dir).as_posix()
+
+    with open(dist_dir / "manifest.json", "w") as file:
+        dump(manifest, file, indent=4, sort_keys=True)
+
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Build fingerprinted static assets")
+    parser.add_argument("--min-size", type=int, default=settings.COMPRESSION_MIN_SIZE)
+    args = parser.parse_args()
+
+    for source, target in build_static(args.min_size).items():
+        print(f"{source} -> {target}")
@@ -0,0 +1,205 @@
+from asyncio import CancelledError, Event, TimeoutError, create_task, wait_for
+from datetime import datetime
+from json import dumps, loads
+from logging import getLogger
+from os import fsync
+from pathlib import Path
+from threading import Lock
+from time import time_ns
+from uuid import uuid4
+
+from sqlalchemy.exc import DataError, IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from crud.exam_record import ExamRecordCrudManager, exam_answer_rows
+from database.mysql import exam_priority
+from settings.configs import get_settings
+from utils.batch import chunked
+
+logger = getLogger(__name__)
+settings = get_settings()
+ExamRecordCrud = ExamRecordCrudManager()
+
+
+def _encode(record: dict):
+    return dumps({**record, "created_at": record["created_at"].isoformat()}) + "\n"
+
+
+def _decode(line: str):
+    record = loads(line)
+    record["created_at"] = datetime.fromisoformat(record["created_at"])
+    return record
+
+
+class SubmissionQueue:
+    """
+    交卷的 write-behind 佇列：計分後將測驗紀錄寫入本機 journal 檔 (fsync) 即回應，
+    背景工作再將累積的紀錄以多筆 INSERT 批次寫入資料庫。
+    資料庫拒絕的紀錄 (例如學生已被刪除) 移至 dead_letter.jsonl，不阻擋後續紀錄。
+
+    每次寫入資料庫前將 journal 換成新的 segment 檔，寫入成功後才刪除該 segment；
+    啟動時會重新寫入所有殘留的 segment (已存在的紀錄會略過)。
+    尚未寫入資料庫的紀錄保存在 pending，供測驗結果頁面使用。
+    """
+
+    def __init__(self, directory: str, batch_size: int, flush_interval: float):
+        self.directory = Path(directory)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending = {}
+        self.queued = []
+        self.segments = []
+        self._lock = Lock()
+        self._journal = None
+        self._wakeup = None
+        self._task = None
+
+    @property
+    def journal_path(self):
+        return self.directory / "journal.jsonl"
+
+    @property
+    def dead_letter_path(self):
+        return self.directory / "dead_letter.jsonl"
+
+    def _append(self, record: dict):
+        line = _encode(record)
+        with self._lock:
+            # Pending before it can be rotated into a batch (and popped by flush)
+            self.pending[record["id"]] = record
+            try:
+                self._journal.write(line)
+                self._journal.flush()
+                fsync(self._journal.fileno())
+            except BaseException:
+                self.pending.pop(record["id"], None)
+                raise
+            self.queued.append(record)
+
+    def _dead_letter(self, record: dict, error: Exception):
+        with open(self.dead_letter_path, "a") as file:
+            file.write(_encode({**record, "error": str(error)}))
+            file.flush()
+            fsync(file.fileno())
+
+    def _rotate(self):
+        with self._lock:
+            self._journal.close()
+            segment = self.directory / f"segment-{time_ns()}.jsonl"
+            self.journal_path.rename(segment)
+            self._journal = open(self.journal_path, "a")
+
+            batch, self.queued = self.queued, []
+            return segment, batch
+
+    async def submit(self, user_id: str, exam_type: str, user_answers, answer_keys):
+        exam_record_id = str(uuid4())
+        answer_rows = exam_answer_rows(exam_record_id, user_answers, answer_keys)
+        record = {
+            "id": exam_record_id,
+            "user_id": user_id,
+            "exam_type": exam_type,
+            "score": sum(row["is_correct"] for row in answer_rows),
+            "user_answers": user_answers,
+            "answer_keys": answer_keys,
+            "answer_rows": answer_rows,
+            "created_at": datetime.now(),
+        }
+        await run_in_threadpool(self._append, record)
+
+        if len(self.queued) >= self.batch_size:
+            self._wakeup.set()
+
+        return record
+
+    async def flush(self):
+        if self.queued:
+            self.segments.append(await run_in_threadpool(self._rotate))
+
+        # Oldest segment first, kept for retry when the insert fails
+        while self.segments:
+            segment, batch = self.segments[0]
+            for chunk in chunked(batch, self.batch_size):
+                try:
+                    await ExamRecordCrud.create_many(chunk)
+                except (IntegrityError, DataError):
+                    await self._insert_one_by_one(chunk)
+
+            for record in batch:
+                self.pending.pop(record["id"], None)
+            segment.unlink()
+            self.segments.pop(0)
+
+    async def _insert_one_by_one(self, chunk: list[dict]):
+        # Records the database rejects (e.g. the student was deleted meanwhile)
+        # are moved to the dead-letter file instead of blocking later segments
+        for record in chunk:
+            try:
+                await ExamRecordCrud.create_many([record])
+            except (IntegrityError, DataError) as e:
+                logger.error("Exam submission %s moved to dead letter", record["id"])
+                await run_in_threadpool(self._dead_letter, record, e.orig)
+
+    async def _flush_worker(self):
+        # Serves exams, may use the DB connections reserved for them
+        exam_priority.set(True)
+        while True:
+            try:
+                await wait_for(self._wakeup.wait(), self.flush_interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self.flush()
+            except CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to flush exam submissions")
+
+    def _recover(self):
+        # Journal left by the previous run becomes a segment as well
+        if self.journal_path.exists():
+            self.journal_path.rename(self.directory / f"segment-{time_ns()}.jsonl")
+
+        for segment in sorted(self.directory.glob("segment-*.jsonl")):
+            with open(segment) as file:
+                batch = [_decode(line) for line in file if line.endswith("\n")]
+            self.segments.append((segment, batch))
+            for record in batch:
+                self.pending[record["id"]] = record
+
+    def start(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._recover()
+        self._journal = open(self.journal_path, "a")
+
+        self._wakeup = Event()
+        if self.segments:
+            self._wakeup.set()
+        self._task = create_task(self._flush_worker())
+
+    async def stop(self):
+        if not self._task:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except CancelledError:
+            pass
+        self._task = None
+
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Failed to flush exam submissions, kept in journal")
+        self._journal.close()
+        self._journal = None
+
+
+submission_queue = SubmissionQueue(
+    directory=settings.SUBMISSION_QUEUE_DIR,
+    batch_size=settings.SUBMISSION_QUEUE_BATCH_SIZE,
+    flush_interval=settings.SUBMISSION_QUEUE_FLUSH_INTERVAL,
+)
@@ -0,0 +1,143 @@
+from collections import Counter, OrderedDict
+from time import monotonic, time
+
+from settings.configs import get_settings
+
+settings = get_settings()
+
+
+class MemoryBucketStore:
+    """
+    行程內的 token bucket，每個 key 保存 (剩餘 token, 更新時間)，
+    以 LRU 限制 key 的數量 (被淘汰的 key 視為 bucket 全滿)。
+    不使用 utils.cache.LRUCache，以免列入快取命中率統計。
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+
+    def _set(self, key: str, bucket):
+        self.buckets[key] = bucket
+        self.buckets.move_to_end(key)
+        while len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+
+    async def take(self, key: str, capacity: float, rate: float):
+        now = monotonic()
+        tokens, updated_at = self.buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._set(key, (tokens, now))
+        return allowed
+
+    async def refund(self, key: str, capacity: float):
+        bucket = self.buckets.get(key)
+        if bucket:
+            tokens, updated_at = bucket
+            self._set(key, (min(capacity, tokens + 1), updated_at))
+
+
+# KEYS[1]: bucket key, ARGV: capacity, rate (tokens / second), now (seconds)
+_REDIS_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - updated_at) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call("HSET", KEYS[1], "tokens", tokens, "updated_at", now)
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 1)
+return allowed
+"""
+
+
+# KEYS[1]: bucket key, ARGV: capacity
+_REDIS_REFUND_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local tokens = tonumber(redis.call("HGET", KEYS[1], "tokens"))
+if tokens then
+    redis.call("HSET", KEYS[1], "tokens", math.min(capacity, tokens + 1))
+end
+return 0
+"""
+
+
+class RedisBucketStore:
+    """多個 worker / 主機共用的 token bucket (以 Lua script 原子性更新)。"""
+
+    def __init__(self, url: str, prefix: str = "login_throttle:"):
+        from redis.asyncio import from_url
+
+        self.redis = from_url(url)
+        self.prefix = prefix
+        self.script = self.redis.register_script(_REDIS_TAKE_SCRIPT)
+        self.refund_script = self.redis.register_script(_REDIS_REFUND_SCRIPT)
+
+    async def take(self, key: str, capacity: float, rate: float):
+        allowed = await self.script(
+            keys=[self.prefix + key], args=[capacity, rate, time()]
+        )
+        return bool(allowed)
+
+    async def refund(self, key: str, capacity: float):
+        await self.refund_script(keys=[self.prefix + key], args=[capacity])
+
+
+class LoginThrottle:
+    """
+    登入嘗試次數限制 (依帳號及來源 IP)，超過限制的請求不查詢資料庫也不執行 bcrypt。
+    每次嘗試先扣除 token，登入成功後退還，只有失敗的嘗試會計入限制
+    (同一 NAT 後的大量學生正常登入不會互相影響)。
+    """
+
+    def __init__(self, store, account_limit, ip_limit):
+        self.store = store
+        self.account_limit = account_limit
+        self.ip_limit = ip_limit
+        self.counters = Counter()
+
+    @staticmethod
+    def _bucket(limit):
+        # limit: {"capacity": 最多連續嘗試次數, "refill_per_minute": 每分鐘回復次數}
+        return limit["capacity"], limit["refill_per_minute"] / 60
+
+    async def allow(self, username: str, ip: str):
+        if not await self.store.take(f"ip:{ip}", *self._bucket(self.ip_limit)):
+            self.counters["rejected_ip"] += 1
+            return False
+
+        if not await self.store.take(
+            f"account:{username}", *self._bucket(self.account_limit)
+        ):
+            self.counters["rejected_account"] += 1
+            return False
+
+        self.counters["allowed"] += 1
+        return True
+
+    async def succeeded(self, username: str, ip: str):
+        await self.store.refund(f"ip:{ip}", self.ip_limit["capacity"])
+        await self.store.refund(f"account:{username}", self.account_limit["capacity"])
+
+
+def new_bucket_store():
+    if settings.THROTTLE_BACKEND == "redis":
+        return RedisBucketStore(settings.THROTTLE_REDIS_URL)
+    return MemoryBucketStore(settings.THROTTLE_MAX_KEYS)
+
+
+login_throttle = LoginThrottle(
+    new_bucket_store(),
+    account_limit=settings.THROTTLE_ACCOUNT_LIMIT,
+    ip_limit=settings.THROTTLE_IP_LIMIT,
+)